@@ -3,15 +3,24 @@ Enhanced Web App - Generates actual files (PPT, PDF, Audio)
 Similar to ChatGPT and NotebookLM
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, Response, stream_with_context
 from course_content_generator import CourseContentGenerator, ContentInput
-from file_generator import FileGenerator
+from file_generator import FileGenerator, resolve_formats
+from job_queue import JobQueue
+from semester_progress import SemesterProgress
+from zip_streamer import run_entries, stream_zip
 import os
-import zipfile
-from datetime import datetime
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
+app.config['GENERATION_WORKERS'] = int(os.environ.get('GENERATION_WORKERS', 2))  # Concurrent generation jobs
+app.config['FILE_PROCESSES'] = int(os.environ.get('FILE_PROCESSES', 1))  # Processes per job (0 = all cores)
+app.config['RENDER_PROCESSES'] = int(os.environ.get('RENDER_PROCESSES', 1))  # Slide/PDF render processes per job (0 = all cores)
+app.config['TTS_CONCURRENCY'] = int(os.environ.get('TTS_CONCURRENCY', 4))  # edge-tts calls in flight per job
+app.config['CONTENT_WORKERS'] = int(os.environ.get('CONTENT_WORKERS', 4))  # Topics researched at once per job
+app.config['TOPIC_TIMEOUT'] = float(os.environ.get('TOPIC_TIMEOUT', 120))  # Seconds before a topic is given up
+
+job_queue = JobQueue(max_workers=app.config['GENERATION_WORKERS'])
 
 @app.route('/')
 def index():
@@ -19,6 +28,7 @@ def index():
 
 @app.route('/generate', methods=['POST'])
 def generate():
+    """Queue a generation job and return its ID right away"""
     try:
         data = request.json
         
@@ -32,68 +42,121 @@ def generate():
             class_duration=int(data['class_duration']),
             mode=data['mode']
         )
-        
-        # Generate content
-        generator = CourseContentGenerator()
-        result = generator.generate(input_data)
-        
-        # Generate files
-        file_gen = FileGenerator()
-        files = file_gen.generate_all(result["content"], result["subject"])
-        
-        # Prepare response
-        response = {
-            "success": True,
-            "subject": result["subject"],
-            "mode": result["generation_mode"],
-            "time_scope": result["time_scope"],
-            "covered_topics": result["generation_summary"]["covered_topics"],
-            "remaining_topics": result["generation_summary"]["remaining_topics"],
-            "files": []
-        }
-        
-        # Add file info
-        for item in files["files"]:
-            file_info = {
-                "topic": item["topic"],
-                "unit": item["unit"],
-                "downloads": {
-                    "ppt": f"/download/{os.path.basename(item['files']['ppt'])}",
-                    "pdf": f"/download/{os.path.basename(item['files']['pdf'])}",
-                    "audio": f"/download/{os.path.basename(item['files']['audio'])}"
-                }
+        course_pack = bool(data.get('course_pack', False))
+        formats = resolve_formats(data.get('formats'))  # e.g. "ppt,pdf"; default all
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    job = job_queue.submit(run_generation, input_data, course_pack, formats,
+                           description=f"{input_data.subject_name} ({input_data.mode})")
+    
+    return jsonify({
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}"
+    }), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Report per-topic and per-artifact progress for a generation job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Unknown job ID"}), 404
+    return jsonify(job.to_dict())
+
+def run_generation(job, input_data, course_pack=False, formats=None):
+    """Runs on a job queue worker: content generation + file generation"""
+    # Generate content
+    job.set_stage("content")
+    generator = CourseContentGenerator(max_workers=app.config['CONTENT_WORKERS'],
+                                       topic_timeout=app.config['TOPIC_TIMEOUT'],
+                                       semester_progress=SemesterProgress('generated_files'))
+    result = generator.generate(input_data)
+    
+    # Generate files
+    job.set_topics([content["topic"] for content in result["content"]])
+    job.set_stage("files")
+    file_gen = FileGenerator(processes=app.config['FILE_PROCESSES'],
+                             render_processes=app.config['RENDER_PROCESSES'],
+                             tts_concurrency=app.config['TTS_CONCURRENCY'],
+                             course_pack=course_pack)
+    files = file_gen.generate_all(result["content"], result["subject"],
+                                  progress_callback=job.report, formats=formats)
+    job.artifacts = files
+    generator.record_failed_topics(result, files["failed_topics"])
+    
+    # Semester mode: the next run moves on to the following week
+    generator.record_semester_progress(result)
+    
+    return build_response(result, files, job.id)
+
+def build_response(result, files, job_id):
+    """Prepare the JSON payload the web UI renders"""
+    response = {
+        "success": True,
+        "subject": result["subject"],
+        "mode": result["generation_mode"],
+        "time_scope": result["time_scope"],
+        "covered_topics": result["generation_summary"]["covered_topics"],
+        "remaining_topics": result["generation_summary"]["remaining_topics"],
+        "failed_topics": result["failed_topics"],
+        "semester": result.get("semester"),
+        "formats": files["formats"],
+        "cache": files["cache"],
+        "files": []
+    }
+    
+    # Add file info
+    for item in files["files"]:
+        file_info = {
+            "topic": item["topic"],
+            "unit": item["unit"],
+            "cached": item["cached"],
+            "up_to_date": item["up_to_date"],
+            "audio_engine": item["audio_engine"],
+            "timings": item["timings"],
+            "critical_path": item["critical_path"],
+            # Every format produced for this run; a video package is a folder,
+            # so it is downloaded inside the run's ZIP
+            "downloads": {
+                artifact: (f"/download-all/{job_id}" if os.path.isdir(item['files'][artifact])
+                           else f"/download/{os.path.basename(item['files'][artifact])}")
+                for artifact in files["formats"] if item["files"].get(artifact)
             }
-            response["files"].append(file_info)
-        
-        response["summary_pdf"] = f"/download/{os.path.basename(files['summary'])}"
-        response["download_all"] = f"/download-all/{result['subject']}"
-        
-        return jsonify(response)
+        }
+        response["files"].append(file_info)
     
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    response["summary_pdf"] = f"/download/{os.path.basename(files['summary'])}"
+    if files.get("course_pack"):
+        response["course_pack_pdf"] = f"/download/{os.path.basename(files['course_pack'])}"
+    response["download_all"] = f"/download-all/{job_id}"
+    
+    return response
 
 @app.route('/download/<filename>')
 def download_file(filename):
     """Download individual file"""
     return send_from_directory('generated_files', filename, as_attachment=True)
 
-@app.route('/download-all/<subject>')
-def download_all(subject):
-    """Download all files as ZIP"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    zip_filename = f"{subject}_{timestamp}.zip"
-    zip_path = os.path.join('generated_files', zip_filename)
+@app.route('/download-all/<job_id>')
+def download_all(job_id):
+    """Stream the files of one generation run as a ZIP"""
+    job = job_queue.get(job_id)
+    if job is None or job.artifacts is None:
+        return jsonify({"success": False, "error": "No finished generation run for this ID"}), 404
     
-    # Create ZIP
-    with zipfile.ZipFile(zip_path, 'w') as zipf:
-        for root, dirs, files in os.walk('generated_files'):
-            for file in files:
-                if not file.endswith('.zip'):
-                    file_path = os.path.join(root, file)
-                    zipf.write(file_path, file)
+    files = job.artifacts
+    entries = run_entries(files, 'generated_files')
+    safe_subject = "".join(c if c.isalnum() or c in '-_' else '_' for c in files["subject"])
+    zip_filename = f"{safe_subject}_{files['timestamp']}.zip"
     
-    return send_file(zip_path, as_attachment=True)
+    return Response(
+        stream_with_context(stream_zip(entries)),
+        mimetype='application/zip',
+        headers={"Content-Disposition": f'attachment; filename="{zip_filename}"'},
+        direct_passthrough=True
+    )
 
 if __name__ == '__main__':
     print("\n" + "="*70)
@@ -103,6 +166,7 @@ if __name__ == '__main__':
     print("  • Generates actual PPT, PDF, and Audio files")
     print("  • Similar to ChatGPT and NotebookLM output")
     print("  • Download individual files or all as ZIP")
+    print(f"  • Background generation with {app.config['GENERATION_WORKERS']} worker(s)")
     print("\n🌐 Server starting...")
     print("  Open: http://localhost:5000")
     print("\n⌨️  Press Ctrl+C to stop")
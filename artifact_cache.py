@@ -0,0 +1,62 @@
+"""
+Artifact Cache - Content-addressed store for generated lecture files
+The same topic content with the same generator settings always produces the
+same PPT/PDF/MP3/MP4, so we render it once and link it into later runs
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+
+def content_hash(*parts):
+    """Stable SHA-256 of JSON-serialisable values"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def link_or_copy(src, dst):
+    """Hardlink src to dst, falling back to a copy across filesystems"""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class ArtifactCache:
+    """Stores artifacts under <cache_dir>/<key[:2]>/<key><ext>"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, artifact, inputs, settings):
+        """Key an artifact by the content fields it reads and the settings used"""
+        return content_hash(artifact, inputs, settings)
+
+    def path_for(self, key, extension):
+        return os.path.join(self.cache_dir, key[:2], f"{key}{extension}")
+
+    def fetch(self, key, target):
+        """Place a cached artifact at target; returns False on a miss"""
+        cached = self.path_for(key, os.path.splitext(target)[1])
+        if not os.path.isfile(cached):
+            return False
+        link_or_copy(cached, target)
+        return True
+
+    def store(self, key, source, replace=False):
+        """Add a freshly rendered artifact to the store (replace overwrites an existing entry)"""
+        cached = self.path_for(key, os.path.splitext(source)[1])
+        if os.path.isfile(cached) and not replace:
+            return cached
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        # Copy under a temp name first so a crash never leaves a partial entry
+        temp = f"{cached}.{uuid.uuid4().hex}.tmp"
+        shutil.copy2(source, temp)
+        os.replace(temp, cached)
+        return cached
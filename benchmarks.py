@@ -0,0 +1,321 @@
+"""
+Benchmarks - Measures the hot paths of file generation
+Run: python benchmarks.py [name ...]   (no names = run all)
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+
+SAMPLE_SLIDE = {
+    "slide_number": 3,
+    "title": "Key Concepts",
+    "bullets": [
+        "Variable declaration and initialization",
+        "Naming conventions and best practices",
+        "Scope and lifetime of variables",
+        "Mutable vs immutable data types",
+        "Type conversion and casting"
+    ]
+}
+
+
+def _timed(fn, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return time.perf_counter() - start
+
+
+def _legacy_slide_background():
+    """Slide background as it was drawn before caching: one line per row"""
+    img = Image.new('RGB', (1920, 1080), color='white')
+    draw = ImageDraw.Draw(img)
+    for y in range(1080):
+        r = int(102 + (66 - 102) * y / 1080)
+        g = int(126 + (135 - 126) * y / 1080)
+        b = int(234 + (245 - 234) * y / 1080)
+        draw.line([(0, y), (1920, y)], fill=(r, g, b))
+    overlay = Image.new('RGBA', (1920, 1080), (255, 255, 255, 30))
+    return Image.alpha_composite(img.convert('RGBA'), overlay).convert('RGB')
+
+
+def bench_slides(repeat=20):
+    """Slides per second: per-slide gradient + font loading vs cached background"""
+    import file_generator
+    from file_generator import FileGenerator, _slide_background
+
+    # The cached background must be pixel-identical to the old drawing
+    if _legacy_slide_background().tobytes() != _slide_background().tobytes():
+        print("  WARNING: cached background differs from the legacy gradient")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = FileGenerator(output_dir=tmp, use_cache=False)
+        out = os.path.join(tmp, "slide.png")
+        render = lambda i: generator._create_slide_image(SAMPLE_SLIDE, out)
+
+        # Before: gradient drawn and fonts loaded for every slide
+        cached_background, cached_fonts = file_generator._slide_background, file_generator._load_fonts
+        file_generator._slide_background = _legacy_slide_background
+        file_generator._load_fonts = cached_fonts.__wrapped__
+        try:
+            before = _timed(render, repeat)
+        finally:
+            file_generator._slide_background, file_generator._load_fonts = cached_background, cached_fonts
+
+        file_generator._slide_background_cache.clear()
+        file_generator._load_fonts.cache_clear()
+        after = _timed(render, repeat)
+
+    print(f"  before (per-slide background): {repeat / before:6.2f} slides/s")
+    print(f"  after  (cached background):    {repeat / after:6.2f} slides/s")
+    print(f"  speedup: {before / after:.2f}x")
+
+
+def bench_audio_duration(minutes=(5, 20)):
+    """MP3 duration: frame-header probe vs full pydub decode on long lectures"""
+    import shutil
+    import subprocess
+    from media_probe import mp3_duration
+
+    if shutil.which("ffmpeg") is None:
+        print("  skipped: ffmpeg is needed to create the test lectures and for pydub")
+        return
+    from pydub import AudioSegment
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for length in minutes:
+            # Same format edge-tts produces: 24 kHz mono, 48 kbps
+            path = os.path.join(tmp, f"lecture_{length}min.mp3")
+            subprocess.run(["ffmpeg", "-loglevel", "error", "-y", "-f", "lavfi",
+                            "-i", f"sine=frequency=220:duration={length * 60}",
+                            "-ac", "1", "-ar", "24000", "-b:a", "48k", path], check=True)
+
+            start = time.perf_counter()
+            probed = mp3_duration(path)
+            probe_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            try:
+                decoded = len(AudioSegment.from_mp3(path)) / 1000.0
+            except OSError as e:
+                print(f"  {length:>3} min: probe {probe_time * 1000:8.1f} ms ({probed:.2f}s)"
+                      f" | pydub unavailable ({e})")
+                continue
+            pydub_time = time.perf_counter() - start
+
+            print(f"  {length:>3} min: probe {probe_time * 1000:8.1f} ms ({probed:.2f}s)"
+                  f" | pydub {pydub_time * 1000:8.1f} ms ({decoded:.2f}s)"
+                  f" | {pydub_time / probe_time:,.0f}x faster")
+
+
+def bench_png_encoding(repeat=10):
+    """Slide PNG size vs save time for each zlib level and encoding profile"""
+    import io
+    from file_generator import FileGenerator, SLIDE_PNG_PROFILES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = FileGenerator(output_dir=tmp, use_cache=False)
+        out = os.path.join(tmp, "slide.png")
+        generator._create_slide_image(SAMPLE_SLIDE, out)
+        with Image.open(out) as img:
+            img.load()
+
+            options = {f"compress_level={level}": {"compress_level": level} for level in (0, 1, 3, 6, 9)}
+            options.update({f"profile {name}": kwargs for name, kwargs in SLIDE_PNG_PROFILES.items()})
+            for label, kwargs in options.items():
+                def save(i):
+                    buffer = io.BytesIO()
+                    img.save(buffer, "PNG", **kwargs)
+                    return buffer
+                size = len(save(0).getvalue())
+                seconds = _timed(save, repeat)
+                print(f"  {label:<18} {size / 1024:9.1f} KB {seconds / repeat * 1000:8.1f} ms/slide")
+
+
+def _pdf_pages(path):
+    with open(path, 'rb') as f:
+        return len(re.findall(rb"/Type /Page\b", f.read()))
+
+
+def bench_pdf(topics=50):
+    """Pages per second for a 50-topic course: per-call styles, serial vs shared styles, pool"""
+    from concurrent.futures import ProcessPoolExecutor
+    from intelligent_content_generator import IntelligentContentGenerator
+    import file_generator
+    from file_generator import FileGenerator, _build_pdf_in_worker
+
+    content_generator = IntelligentContentGenerator()
+    course = []
+    for i in range(topics):
+        content = content_generator.generate_content(f"Topic {i + 1}", "Unit 1", "intermediate")
+        content.update({"topic": f"Topic {i + 1}", "unit": "Unit 1", "difficulty": "intermediate"})
+        course.append(content)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = FileGenerator(output_dir=tmp, use_cache=False)
+        base = lambda label, i: os.path.join(tmp, f"{label}_{i}")
+
+        # Before: a fresh stylesheet per document, one document after another
+        cached_styles = file_generator._pdf_styles
+        file_generator._pdf_styles = cached_styles.__wrapped__
+        try:
+            before = _timed(lambda i: generator.generate_pdf(course[i], base("before", i)), topics)
+        finally:
+            file_generator._pdf_styles = cached_styles
+        pages = sum(_pdf_pages(f"{base('before', i)}.pdf") for i in range(topics))
+
+        shared = _timed(lambda i: generator.generate_pdf(course[i], base("shared", i)), topics)
+
+        workers = os.cpu_count() or 1
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_build_pdf_in_worker, [generator] * topics, course,
+                          [base("pool", i) for i in range(topics)]))
+        pooled = time.perf_counter() - start
+
+    print(f"  {topics} topics, {pages} pages")
+    for label, seconds in (("before (per-call styles, serial)", before),
+                           ("shared styles, serial", shared),
+                           (f"shared styles, {workers} processes", pooled)):
+        print(f"  {label + ':':<34} {pages / seconds:7.1f} pages/s")
+
+
+def _legacy_generate_ppt(content, filename):
+    """Deck as it was built before the shared master: python-pptx, paragraph by paragraph"""
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    prs = Presentation()
+    prs.slide_width = Inches(10)
+    prs.slide_height = Inches(7.5)
+    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    slide.shapes.title.text = content["topic"]
+    slide.placeholders[1].text = f"{content['unit']}\nDifficulty: {content['difficulty']}"
+    for slide_data in content["ppt_slides"]:
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = slide_data["title"]
+        tf = slide.placeholders[1].text_frame
+        for bullet in slide_data["bullets"]:
+            p = tf.add_paragraph()
+            p.text = bullet
+            p.level = 0
+    prs.save(filename)
+
+
+def bench_pptx(slide_counts=(5, 10, 20, 40), repeat=10):
+    """PPTX throughput: fresh Presentation per deck vs cloned master with bulk slide XML"""
+    from file_generator import FileGenerator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = FileGenerator(output_dir=tmp, use_cache=False)
+        base = os.path.join(tmp, "deck")
+        generator.generate_ppt({"topic": "Warm-up", "unit": "Unit 1", "difficulty": "easy",
+                                "ppt_slides": [SAMPLE_SLIDE]}, base)
+
+        print(f"  {'slides':>6} {'before ms/deck':>15} {'after ms/deck':>14} {'after slides/s':>15}")
+        for count in slide_counts:
+            content = {"topic": "Variables", "unit": "Unit 1", "difficulty": "beginner",
+                       "ppt_slides": [SAMPLE_SLIDE] * count}
+            before = _timed(lambda i: _legacy_generate_ppt(content, f"{base}.pptx"), repeat) / repeat
+            after = _timed(lambda i: generator.generate_ppt(content, base), repeat) / repeat
+            print(f"  {count:>6} {before * 1000:>15.1f} {after * 1000:>14.1f} {(count + 1) / after:>15.0f}")
+
+
+def _legacy_group_into_lectures(durations, capacity):
+    """Lectures as they were packed before packing.py: next fit in syllabus order"""
+    lectures, current, used = [], [], 0
+    for i, duration in enumerate(durations):
+        if current and used + duration > capacity:
+            lectures.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += duration
+    if current:
+        lectures.append(current)
+    return lectures
+
+
+def _legacy_allocate(durations, budget):
+    """Topics one week got before packing.py: take topics until the first that does not fit"""
+    allocated, used = [], 0
+    for i, duration in enumerate(durations):
+        if used + duration > budget:
+            break
+        allocated.append(i)
+        used += duration
+    return allocated
+
+
+def bench_packing(sizes=(100, 1000, 5000), capacity=90, weekly_classes=3, sections=200, lookahead=8):
+    """Lecture packing: next fit / first-misfit cut-off vs in-order packing and lookahead"""
+    import random
+    from packing import pack_lectures
+
+    rng = random.Random(7)
+    minutes = (15, 20, 30, 40, 45, 60, 75)
+
+    print(f"  whole syllabus into {capacity}-minute lectures (lower bound = total / capacity);"
+          f" reorder = lookahead {lookahead}")
+    print(f"  {'topics':>6} {'bound':>6} {'greedy':>7} {'in order':>8} {'reorder':>8}"
+          f" {'in-order util':>13} {'reorder util':>12} {'in-order ms':>11} {'reorder ms':>10}")
+    for size in sizes:
+        durations = [rng.choice(minutes) for _ in range(size)]
+        total = sum(durations)
+        bound = -(-total // capacity)
+
+        greedy = _legacy_group_into_lectures(durations, capacity)
+        start = time.perf_counter()
+        ordered = pack_lectures(durations, capacity)
+        ordered_time = time.perf_counter() - start
+        start = time.perf_counter()
+        reordered = pack_lectures(durations, capacity, lookahead=lookahead)
+        reordered_time = time.perf_counter() - start
+
+        print(f"  {size:>6} {bound:>6} {len(greedy):>7} {len(ordered):>8} {len(reordered):>8}"
+              f" {total / (len(ordered) * capacity):>13.1%} {total / (len(reordered) * capacity):>12.1%}"
+              f" {ordered_time * 1000:>11.1f} {reordered_time * 1000:>10.1f}")
+
+    # One week per section: old cut-off + next fit could also overrun the week's classes
+    budget = weekly_classes * capacity
+    greedy_minutes = ordered_minutes = reordered_minutes = overbooked = 0
+    for _ in range(sections):
+        durations = [rng.choice(minutes) for _ in range(40)]
+        allocated = _legacy_allocate(durations, budget)
+        greedy_minutes += sum(durations[i] for i in allocated)
+        overbooked += len(_legacy_group_into_lectures([durations[i] for i in allocated],
+                                                      capacity)) > weekly_classes
+        week = pack_lectures(durations, capacity, max_lectures=weekly_classes, budget=budget)
+        ordered_minutes += sum(durations[i] for lecture in week for i in lecture)
+        week = pack_lectures(durations, capacity, max_lectures=weekly_classes, budget=budget,
+                             lookahead=lookahead)
+        reordered_minutes += sum(durations[i] for lecture in week for i in lecture)
+    print(f"  one week of {weekly_classes} x {capacity} min over {sections} sections:"
+          f" greedy {greedy_minutes / (sections * budget):.1%} of class time"
+          f" ({overbooked} weeks needed extra lectures),"
+          f" in order {ordered_minutes / (sections * budget):.1%},"
+          f" reorder {reordered_minutes / (sections * budget):.1%}")
+
+BENCHMARKS = {
+    "slides": bench_slides,
+    "png_encoding": bench_png_encoding,
+    "pdf": bench_pdf,
+    "pptx": bench_pptx,
+    "audio_duration": bench_audio_duration,
+    "packing": bench_packing,
+}
+
+
+def main(names):
+    for name in names or BENCHMARKS:
+        print(f"\n[{name}] {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -4,15 +4,23 @@ Multi-agent system for curriculum planning and content generation
 """
 
 import json
-from typing import Dict, List, Any
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
+from intelligent_content_generator import ContentFieldError
+from packing import DEFAULT_LOOKAHEAD, pack_lectures
+from semester_progress import SemesterProgress, week_key
 
 
 class GenerationMode(Enum):
     WEEKLY = "Weekly"
     LECTURE_WISE = "Lecture-wise"
     MONTHLY = "Monthly"
+    SEMESTER = "Semester"
 
 
 @dataclass
@@ -102,10 +110,20 @@ class CurriculumPlanningAgent:
 
 
 class SchedulingAgent:
-    """Agent 3: Allocates topics based on generation mode"""
+    """Agent 3: Allocates topics based on generation mode
+    
+    Lectures follow syllabus order; lookahead > 0 lets a lecture pull that
+    many later topics forward to fill its leftover time (see packing.py).
+    """
+    
+    # Semester length when course_duration gives none
+    DEFAULT_SEMESTER_WEEKS = 14
+    
+    def __init__(self, lookahead: int = DEFAULT_LOOKAHEAD):
+        self.lookahead = lookahead
     
     def schedule(self, planned_topics: List[Dict], mode: str, 
-                 class_duration: int, timetable: str) -> Dict[str, Any]:
+                 class_duration: int, timetable: str, course_duration: str = "") -> Dict[str, Any]:
         
         if mode == GenerationMode.WEEKLY.value:
             return self._schedule_weekly(planned_topics, class_duration, timetable)
@@ -113,6 +131,8 @@ class SchedulingAgent:
             return self._schedule_lecture(planned_topics, class_duration)
         elif mode == GenerationMode.MONTHLY.value:
             return self._schedule_monthly(planned_topics, class_duration, timetable)
+        elif mode == GenerationMode.SEMESTER.value:
+            return self._schedule_semester(planned_topics, class_duration, timetable, course_duration)
         
         return {"lectures": [], "time_scope": ""}
     
@@ -121,20 +141,12 @@ class SchedulingAgent:
         weekly_classes = self._parse_weekly_classes(timetable)
         total_time = weekly_classes * class_duration
         
-        allocated = []
-        time_used = 0
-        
-        for topic in topics:
-            if time_used + topic["estimated_minutes"] <= total_time:
-                allocated.append(topic)
-                time_used += topic["estimated_minutes"]
-            else:
-                break
+        lectures = self._group_into_lectures(topics, class_duration, weekly_classes, total_time)
         
         return {
             "time_scope": "Week 1",
-            "lectures": self._group_into_lectures(allocated, class_duration),
-            "allocated_topics": allocated
+            "lectures": lectures,
+            "allocated_topics": [topic for lecture in lectures for topic in lecture["topics"]]
         }
     
     def _schedule_lecture(self, topics: List[Dict], class_duration: int) -> Dict:
@@ -168,44 +180,79 @@ class SchedulingAgent:
         weekly_classes = self._parse_weekly_classes(timetable)
         total_time = weekly_classes * class_duration * 4
         
-        allocated = []
-        time_used = 0
-        
-        for topic in topics:
-            if time_used + topic["estimated_minutes"] <= total_time:
-                allocated.append(topic)
-                time_used += topic["estimated_minutes"]
-            else:
-                break
+        lectures = self._group_into_lectures(topics, class_duration, weekly_classes * 4, total_time)
         
         return {
             "time_scope": "Month 1",
-            "lectures": self._group_into_lectures(allocated, class_duration),
-            "allocated_topics": allocated
+            "lectures": lectures,
+            "allocated_topics": [topic for lecture in lectures for topic in lecture["topics"]]
+        }
+    
+    def _schedule_semester(self, topics: List[Dict], class_duration: int, timetable: str,
+                           course_duration: str) -> Dict:
+        # Plan every week of the course, in syllabus order
+        weekly_classes = self._parse_weekly_classes(timetable)
+        week_time = weekly_classes * class_duration
+        total_weeks = self._parse_course_weeks(course_duration)
+        
+        # Position in the whole course keeps file names stable between runs
+        pending = [dict(topic, topic_number=number) for number, topic in enumerate(topics, 1)]
+        weeks = []
+        while pending and len(weeks) < total_weeks:
+            lectures = self._group_into_lectures(pending, class_duration, weekly_classes, week_time)
+            if not lectures:
+                # A topic longer than a whole week still gets a week of its own
+                lectures = self._group_into_lectures(pending[:1], class_duration)
+            allocated = [topic for lecture in lectures for topic in lecture["topics"]]
+            weeks.append({
+                "week_number": len(weeks) + 1,
+                "topics": allocated,
+                "duration": sum(t["estimated_minutes"] for t in allocated),
+                "lectures": lectures
+            })
+            scheduled = {topic["topic_number"] for topic in allocated}
+            pending = [topic for topic in pending if topic["topic_number"] not in scheduled]
+        
+        return {
+            "time_scope": f"Semester ({total_weeks} weeks)",
+            "weeks": weeks,
+            "lectures": [lecture for week in weeks for lecture in week["lectures"]],
+            "allocated_topics": [topic for week in weeks for topic in week["topics"]]
         }
     
+    def _parse_course_weeks(self, course_duration: str) -> int:
+        # "14 weeks", "4 months" (4 weeks each); anything else is a default semester
+        match = re.search(r"(\d+)\s*(week|month)?", course_duration or "", re.IGNORECASE)
+        if not match:
+            return self.DEFAULT_SEMESTER_WEEKS
+        count = int(match.group(1))
+        if (match.group(2) or "").lower() == "month":
+            count *= 4
+        elif not match.group(2):
+            return self.DEFAULT_SEMESTER_WEEKS
+        return max(1, count)
+    
     def _parse_weekly_classes(self, timetable: str) -> int:
         # Simple parser - count class mentions
         return max(2, timetable.lower().count("class"))
     
-    def _group_into_lectures(self, topics: List[Dict], class_duration: int) -> List[Dict]:
-        lectures = []
-        current_lecture = {"lecture_number": 1, "topics": [], "duration": 0}
+    def _group_into_lectures(self, topics: List[Dict], class_duration: int,
+                             max_lectures: Optional[int] = None,
+                             total_time: Optional[int] = None) -> List[Dict]:
+        # Fill each lecture with the next topics that fit (see packing.py);
+        # with limits, only the topics that fit max_lectures / total_time are returned
+        packed = pack_lectures([topic["estimated_minutes"] for topic in topics], class_duration,
+                               max_lectures=max_lectures, budget=total_time,
+                               lookahead=self.lookahead)
         
-        for topic in topics:
-            if current_lecture["duration"] + topic["estimated_minutes"] <= class_duration:
-                current_lecture["topics"].append(topic)
-                current_lecture["duration"] += topic["estimated_minutes"]
-            else:
-                lectures.append(current_lecture)
-                current_lecture = {
-                    "lecture_number": len(lectures) + 1,
-                    "topics": [topic],
-                    "duration": topic["estimated_minutes"]
-                }
-        
-        if current_lecture["topics"]:
-            lectures.append(current_lecture)
+        lectures = []
+        for number, indices in enumerate(packed, 1):
+            lecture_topics = [topics[i] for i in indices]
+            lectures.append({
+                "lecture_number": number,
+                "topics": lecture_topics,
+                "duration": sum(topic["estimated_minutes"] for topic in lecture_topics)
+            })
         
         return lectures
 
@@ -220,11 +267,14 @@ class ContentGenerationAgent:
     
     def generate(self, topic_data: Dict) -> Dict[str, Any]:
         # Use intelligent generator for real content
-        return self.intelligent_generator.generate_content(
+        content = self.intelligent_generator.generate_content(
             topic_data["topic"],
             topic_data["unit"],
             topic_data["difficulty"]
         )
+        if "topic_number" in topic_data:
+            content["topic_number"] = topic_data["topic_number"]
+        return content
 
 
 class ValidationAgent:
@@ -262,20 +312,37 @@ class ValidationAgent:
     def _check_content_quality(self, content: List[Dict]) -> bool:
         # Basic quality checks
         for item in content:
-            if not item.get("learning_objectives") or not item.get("ppt_slides"):
+            try:
+                if not item.get("learning_objectives") or not item.get("ppt_slides"):
+                    return False
+            except ContentFieldError:
                 return False
         return True
 
 
 class CourseContentGenerator:
-    """Main orchestrator - coordinates all agents"""
+    """Main orchestrator - coordinates all agents
     
-    def __init__(self):
+    max_workers > 1 generates topic content concurrently (useful once research
+    waits on the network); topic_timeout gives up on a topic after that many
+    seconds. Topics that fail or time out are reported in "failed_topics".
+    
+    In Semester mode every week of the course is planned, but content is only
+    generated for the next weeks_per_run weeks that semester_progress does not
+    list as materialized; call record_semester_progress once their files exist.
+    """
+    
+    def __init__(self, max_workers: int = 1, topic_timeout: Optional[float] = None,
+                 semester_progress: Optional[SemesterProgress] = None, weeks_per_run: int = 1):
         self.syllabus_agent = SyllabusAnalysisAgent()
         self.planning_agent = CurriculumPlanningAgent()
         self.scheduling_agent = SchedulingAgent()
         self.content_agent = ContentGenerationAgent()
         self.validation_agent = ValidationAgent()
+        self.max_workers = max(1, max_workers)
+        self.topic_timeout = topic_timeout
+        self.semester_progress = semester_progress
+        self.weeks_per_run = max(1, weeks_per_run)
     
     def generate(self, input_data: ContentInput) -> Dict[str, Any]:
         # STEP 1: Analyze syllabus
@@ -296,13 +363,16 @@ class CourseContentGenerator:
             planned_topics,
             input_data.mode,
             input_data.class_duration,
-            input_data.timetable_text
+            input_data.timetable_text,
+            input_data.course_duration
         )
         
+        semester = None
+        if input_data.mode == GenerationMode.SEMESTER.value:
+            schedule, semester = self._select_semester_weeks(schedule, input_data.subject_name)
+        
         # STEP 4: Generate content for allocated topics
-        content = []
-        for topic in schedule["allocated_topics"]:
-            content.append(self.content_agent.generate(topic))
+        content, failed_topics = self._generate_content(schedule["allocated_topics"])
         
         # STEP 5: Validate
         validation = self.validation_agent.validate(
@@ -311,8 +381,17 @@ class CourseContentGenerator:
         
         # Prepare output
         all_topics = [t["topic"] for t in planned_topics]
-        covered_topics = [t["topic"] for t in schedule["allocated_topics"]]
-        remaining_topics = [t for t in all_topics if t not in covered_topics]
+        failed = {t["topic"] for t in failed_topics}
+        covered_topics = [t["topic"] for t in schedule["allocated_topics"] if t["topic"] not in failed]
+        done = set()
+        if semester is not None:
+            for week in semester["weeks"]:
+                if week["status"] == "materialized":
+                    done.update(week["topics"])
+                elif week["status"] == "generating":
+                    week["status"] = "incomplete" if failed & set(week["topics"]) else "generated"
+        remaining_topics = [t for t in all_topics
+                            if t not in covered_topics and t not in failed and t not in done]
         
         output = {
             "subject": input_data.subject_name,
@@ -327,10 +406,138 @@ class CourseContentGenerator:
                 "covered_topics": covered_topics,
                 "remaining_topics": remaining_topics
             },
+            "failed_topics": failed_topics,
             "validation": validation
         }
+        if semester is not None:
+            output["semester"] = semester
         
         return output
+    
+    def _select_semester_weeks(self, schedule: Dict, subject: str) -> Tuple[Dict, Dict]:
+        """Narrow a semester plan to the next weeks whose files do not exist yet"""
+        weeks = []
+        for week in schedule["weeks"]:
+            key = week_key(subject, week)
+            materialized = (self.semester_progress is not None
+                            and self.semester_progress.is_materialized(key))
+            weeks.append(dict(week, key=key, status="materialized" if materialized else "pending"))
+        
+        selected = [week for week in weeks if week["status"] == "pending"][:self.weeks_per_run]
+        for week in selected:
+            week["status"] = "generating"
+        
+        numbers = [week["week_number"] for week in selected]
+        if not numbers:
+            time_scope = f"{schedule['time_scope']} - all weeks generated"
+        elif len(numbers) == 1:
+            time_scope = f"Week {numbers[0]} of {len(weeks)}"
+        else:
+            time_scope = f"Weeks {numbers[0]}-{numbers[-1]} of {len(weeks)}"
+        
+        scoped = {
+            "time_scope": time_scope,
+            "lectures": [lecture for week in selected for lecture in week["lectures"]],
+            "allocated_topics": [topic for week in selected for topic in week["topics"]]
+        }
+        semester = {
+            "total_weeks": len(weeks),
+            "weeks": [{
+                "week_number": week["week_number"],
+                "key": week["key"],
+                "status": week["status"],
+                "duration": week["duration"],
+                "topics": [t["topic"] for t in week["topics"]]
+            } for week in weeks]
+        }
+        return scoped, semester
+    
+    def record_failed_topics(self, result: Dict[str, Any], failed_topics: List[Dict]):
+        """Move topics whose files could not be built from covered to failed
+        
+        Their weeks are left incomplete, so Semester mode generates them again.
+        """
+        if not failed_topics:
+            return
+        result["failed_topics"].extend(failed_topics)
+        failed = {t["topic"] for t in failed_topics}
+        summary = result["generation_summary"]
+        summary["covered_topics"] = [t for t in summary["covered_topics"] if t not in failed]
+        for week in result.get("semester", {}).get("weeks", []):
+            if week["status"] == "generated" and failed & set(week["topics"]):
+                week["status"] = "incomplete"
+    
+    def record_semester_progress(self, result: Dict[str, Any]):
+        """Mark the weeks generated in result as materialized (after their files are built)"""
+        if self.semester_progress is None or "semester" not in result:
+            return
+        generated = [week for week in result["semester"]["weeks"] if week["status"] == "generated"]
+        self.semester_progress.record(result["subject"], generated)
+        for week in generated:
+            week["status"] = "materialized"
+    
+    def _generate_content(self, topics: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Content for each topic in schedule order, plus the topics that failed"""
+        results: List[Optional[Dict]] = [None] * len(topics)
+        errors: Dict[int, str] = {}
+        
+        if self.max_workers == 1 and self.topic_timeout is None:
+            for i, topic in enumerate(topics):
+                try:
+                    results[i] = self.content_agent.generate(topic)
+                except Exception as e:
+                    errors[i] = (str(e) or type(e).__name__)[:200]
+        else:
+            self._generate_content_concurrently(topics, results, errors)
+        
+        failed_topics = []
+        for i, error in sorted(errors.items()):
+            print(f"⚠️ Content generation failed for {topics[i]['topic']}: {error}")
+            failed_topics.append({"topic": topics[i]["topic"], "unit": topics[i]["unit"], "error": error})
+        
+        return [item for item in results if item is not None], failed_topics
+    
+    def _generate_content_concurrently(self, topics: List[Dict], results: List, errors: Dict):
+        """Run topic generation max_workers at a time with a per-topic timeout
+        
+        A topic is only handed to a thread when it starts, so its timeout
+        counts from then. A timed-out call cannot be interrupted; its result
+        is discarded and it stops counting against max_workers, so the topics
+        still queued are not held up by calls that hang.
+        """
+        queue = deque(enumerate(topics))
+        running: Dict[Any, Tuple[int, float]] = {}  # future -> (topic index, deadline)
+        
+        # One thread per topic at most: abandoned calls keep theirs until they return
+        pool = ThreadPoolExecutor(max_workers=len(topics) or 1, thread_name_prefix="content")
+        try:
+            while queue or running:
+                while queue and len(running) < self.max_workers:
+                    i, topic = queue.popleft()
+                    deadline = None if self.topic_timeout is None else time.monotonic() + self.topic_timeout
+                    running[pool.submit(self.content_agent.generate, topic)] = (i, deadline)
+                
+                timeout = None
+                if self.topic_timeout is not None:
+                    timeout = max(0.0, min(deadline for _, deadline in running.values()) - time.monotonic())
+                
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, _ = running.pop(future)
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        errors[i] = (str(e) or type(e).__name__)[:200]
+                
+                if self.topic_timeout is not None:
+                    now = time.monotonic()
+                    for future, (i, deadline) in list(running.items()):
+                        if now >= deadline:
+                            del running[future]
+                            errors[i] = f"timed out after {self.topic_timeout}s"
+        finally:
+            # Every submitted topic is running; nothing is queued in the pool to cancel
+            pool.shutdown(wait=False)
 
 
 def main():
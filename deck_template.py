@@ -0,0 +1,106 @@
+"""
+Deck Template - Precompiled PowerPoint master shared by every lecture deck
+The master (default layouts at our slide size) is built once per
+process and cloned from memory for each deck; slides are written as whole
+XML documents instead of being assembled paragraph by paragraph
+"""
+
+import io
+import re
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml import parse_xml
+from pptx.parts.slide import SlidePart
+from pptx.util import Inches
+
+
+TITLE_LAYOUT = 0
+BULLET_LAYOUT = 1
+
+SLIDE_WIDTH = Inches(10)
+SLIDE_HEIGHT = Inches(7.5)
+
+# Characters that are not allowed in XML 1.0 documents
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_SLIDE_XML = (
+    '<p:sld xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+    ' xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<p:cSld><p:spTree>'
+    '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+    '{title}{body}'
+    '</p:spTree></p:cSld>'
+    '<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr>'
+    '</p:sld>'
+)
+
+_PLACEHOLDER_XML = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="{id}" name="{name}"/>'
+    '<p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>'
+    '<p:nvPr><p:ph{ph}/></p:nvPr></p:nvSpPr><p:spPr/>'
+    '<p:txBody><a:bodyPr/><a:lstStyle/>{paragraphs}</p:txBody></p:sp>'
+)
+
+# (name, ph attributes) of the title and body placeholders, as python-pptx clones them
+_PLACEHOLDERS = {
+    TITLE_LAYOUT: (("Title 1", ' type="ctrTitle"'), ("Subtitle 2", ' type="subTitle" idx="1"')),
+    BULLET_LAYOUT: (("Title 1", ' type="title"'), ("Content Placeholder 2", ' idx="1"')),
+}
+
+
+@lru_cache(maxsize=None)
+def _template_bytes():
+    """The default master at our slide size, as .pptx bytes"""
+    # The full set of layouts is kept so decks stay editable with the standard
+    # layouts in PowerPoint, as they were before the master was precompiled
+    prs = Presentation()
+    prs.slide_width = SLIDE_WIDTH
+    prs.slide_height = SLIDE_HEIGHT
+
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def new_deck():
+    """A fresh Presentation cloned from the in-memory master"""
+    return Presentation(io.BytesIO(_template_bytes()))
+
+
+def _paragraph_xml(text):
+    """One <a:p>; line breaks inside the text become <a:br/>"""
+    if not text:
+        return '<a:p/>'
+    lines = _INVALID_XML_CHARS.sub("", text.replace("\v", "\n")).split("\n")
+    runs = '<a:br/>'.join(f'<a:r><a:t>{escape(line)}</a:t></a:r>' for line in lines)
+    return f'<a:p>{runs}</a:p>'
+
+
+def _slide_xml(layout_index, title, paragraphs):
+    shapes = []
+    for shape_id, ((name, ph), texts) in enumerate(zip(_PLACEHOLDERS[layout_index],
+                                                       ([title], paragraphs)), 2):
+        shapes.append(_PLACEHOLDER_XML.format(
+            id=shape_id, name=name, ph=ph,
+            paragraphs="".join(_paragraph_xml(text) for text in texts) or '<a:p/>'))
+    return _SLIDE_XML.format(title=shapes[0], body=shapes[1])
+
+
+def add_slide(prs, layout_index, title, paragraphs):
+    """Append a slide on one of the master's layouts, filled in a single XML parse
+
+    paragraphs are the body (or subtitle) placeholder's paragraphs in order.
+    """
+    presentation_part = prs.part
+    partname = presentation_part._next_slide_partname
+    slide_part = SlidePart.new(partname, presentation_part.package,
+                               prs.slide_layouts[layout_index].part)
+    # Swap the blank slide for the complete one before anything reads it
+    slide_part._element = parse_xml(_slide_xml(layout_index, title, paragraphs).encode("utf-8"))
+
+    rId = presentation_part.relate_to(slide_part, RT.SLIDE)
+    prs.slides._sldIdLst.add_sldId(rId)
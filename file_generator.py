@@ -5,8 +5,6 @@ Similar to GPT and NotebookLM output
 
 import os
 from datetime import datetime
-from pptx import Presentation
-from pptx.util import Inches, Pt
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -14,113 +12,699 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER
 from gtts import gTTS
 import json
+import pickle
 from PIL import Image, ImageDraw, ImageFont
 import subprocess
+import threading
+from functools import partial, lru_cache
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed
+from multiprocessing import Manager
+from artifact_cache import ArtifactCache, content_hash, link_or_copy
+from zip_streamer import PACKAGE_MANIFEST, write_package_manifest
+from speech_synthesis import SpeechSynthesizer, AudioCache, CircuitOpenError, get_breaker
+from stage_graph import StageGraph
+from intelligent_content_generator import ContentFieldError
+import deck_template
+from media_probe import mp3_duration
+from slide_timing import build_cues
+
+
+# Content fields each artifact is rendered from (used for cache keys)
+ARTIFACT_INPUTS = {
+    "ppt": ("topic", "unit", "difficulty", "ppt_slides"),
+    "pdf": ("topic", "unit", "difficulty", "learning_objectives", "pdf_notes"),
+    "audio": ("audio_script",),
+    "video": ("ppt_slides", "audio_script", "video_content"),
+}
+
+ARTIFACT_EXTENSIONS = {"ppt": ".pptx", "pdf": ".pdf", "audio": ".mp3", "video": ".mp4"}
+
+# Other artifacts a format cannot be built without (the video is muxed with the audio)
+ARTIFACT_DEPENDENCIES = {"video": ("audio",)}
+
+
+def resolve_formats(formats=None):
+    """Artifacts to build for the requested formats, in ARTIFACT_EXTENSIONS order
+    
+    formats is a list or a comma-separated string such as "ppt,pdf"; None
+    (or "all") means every format. Dependencies are added automatically.
+    """
+    if formats is None:
+        return tuple(ARTIFACT_EXTENSIONS)
+    if isinstance(formats, str):
+        formats = formats.split(",")
+    requested = {name.strip().lower() for name in formats if name.strip()}
+    if "all" in requested:
+        return tuple(ARTIFACT_EXTENSIONS)
+    
+    unknown = requested - set(ARTIFACT_EXTENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown format(s) {sorted(unknown)}, "
+                         f"expected some of {list(ARTIFACT_EXTENSIONS)}")
+    if not requested:
+        raise ValueError("At least one format must be requested")
+    
+    for artifact in list(requested):
+        requested.update(ARTIFACT_DEPENDENCIES.get(artifact, ()))
+    return tuple(artifact for artifact in ARTIFACT_EXTENSIONS if artifact in requested)
+
+# Written next to the output: input hash and file stats of every artifact built
+BUILD_MANIFEST = "build_manifest.json"
+
+# Jobs in one process (the web app's worker threads) update the manifest in turn
+_manifest_lock = threading.Lock()
+
+
+SLIDE_SIZE = (1920, 1080)
+
+# Identifies the slide look in slide cache keys; change it with the design
+SLIDE_THEME = "purple-gradient"
+
+# PNG save options per encoding profile (FileGenerator slide_encoding).
+# "standard" is PIL's zlib level 6, what slides have always used; "fast" is
+# for slides that only feed the video encoder (about 2x the bytes, a third
+# less time); "archive" is barely smaller and takes about 1.5x as long
+SLIDE_PNG_PROFILES = {
+    "standard": {"compress_level": 6},
+    "fast": {"compress_level": 1},
+    "archive": {"optimize": True},
+}
+
+# Font files tried in order before falling back to PIL's built-in bitmap font
+FONT_CANDIDATES = ("arial.ttf", "C:\\Windows\\Fonts\\arial.ttf")
+
+_slide_background_cache = {}
+
+
+def _slide_background():
+    """Copy of the purple-to-blue slide gradient, built once per process"""
+    if "default" not in _slide_background_cache:
+        width, height = SLIDE_SIZE
+        top = (102, 126, 234)
+        bottom = (66, 135, 245)
+        try:
+            import numpy as np
+            
+            # Same per-row colours as drawing one line per row, computed in one go
+            rows = np.arange(height).reshape(-1, 1)
+            colours = np.array(top) + (np.array(bottom) - np.array(top)) * rows / height
+            gradient = np.broadcast_to(colours.astype(np.uint8)[:, None, :], (height, width, 3))
+            img = Image.fromarray(np.ascontiguousarray(gradient), 'RGB')
+        except ImportError:
+            img = Image.new('RGB', SLIDE_SIZE, color='white')
+            draw = ImageDraw.Draw(img)
+            for y in range(height):
+                colour = tuple(int(t + (b - t) * y / height) for t, b in zip(top, bottom))
+                draw.line([(0, y), (width, y)], fill=colour)
+        
+        # Semi-transparent overlay for better text readability
+        overlay = Image.new('RGBA', SLIDE_SIZE, (255, 255, 255, 30))
+        img = Image.alpha_composite(img.convert('RGBA'), overlay).convert('RGB')
+        _slide_background_cache["default"] = img
+    
+    return _slide_background_cache["default"].copy()
+
+
+@lru_cache(maxsize=None)
+def _load_fonts(title_size, text_size):
+    """Resolve the slide fonts once per process"""
+    for font_path in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(font_path, title_size), ImageFont.truetype(font_path, text_size)
+        except OSError:
+            continue
+    return ImageFont.load_default(), ImageFont.load_default()
+
+
+@lru_cache(maxsize=None)
+def _pdf_styles():
+    """Paragraph styles for the notes and summary PDFs, built once per process
+    
+    Shared by every document - treat the styles as read-only.
+    """
+    styles = getSampleStyleSheet()
+    return MappingProxyType({
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor='#667eea',
+            spaceAfter=30,
+            alignment=TA_CENTER
+        ),
+        "heading": ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=16,
+            textColor='#764ba2',
+            spaceAfter=12,
+            spaceBefore=12
+        ),
+        "body": ParagraphStyle(
+            'CustomBody',
+            parent=styles['BodyText'],
+            fontSize=11,
+            alignment=TA_JUSTIFY,
+            spaceAfter=12
+        ),
+        "summary_heading": ParagraphStyle(
+            'Heading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor='#764ba2',
+            spaceAfter=12
+        ),
+        "summary_body": styles['BodyText'],
+    })
+
+
+def _portable_speech_result(result):
+    """A batch TTS result that can be sent to another process
+    
+    Network errors from edge-tts can hold unpicklable state (an SSLContext);
+    those become a RuntimeError carrying the same message.
+    """
+    if isinstance(result, Exception):
+        try:
+            pickle.loads(pickle.dumps(result))
+        except Exception:
+            return RuntimeError(f"{type(result).__name__}: {result}")
+    return result
+
+
+class _SharedSpeechResult:
+    """A topic's batch TTS result that a worker process can wait for
+    
+    Futures cannot cross processes, so the resolved value is handed over
+    through a multiprocessing manager; the topic is submitted right away and
+    only its audio stage waits.
+    """
+    
+    def __init__(self, results, ready, key):
+        self._results = results
+        self._ready = ready
+        self._key = key
+    
+    def set_from(self, future):
+        try:
+            self._results[self._key] = _portable_speech_result(future.result())
+            self._ready.set()
+        except Exception as e:  # Manager already gone - the run is over
+            print(f"      ⚠️ Could not hand over TTS result: {str(e)[:80]}")
+    
+    def result(self):
+        self._ready.wait()
+        return self._results[self._key]
 
 
 class FileGenerator:
     """Generates actual files from content data"""
     
-    def __init__(self, output_dir="generated_files"):
+    # Bump when rendering code changes so stale cached artifacts are not reused
+    RENDER_VERSION = 1
+    
+    def __init__(self, output_dir="generated_files", use_cache=True, processes=1,
+                 tts_concurrency=4, tts_timeout=120, audio_cache_bytes=2 * 1024 ** 3,
+                 render_processes=0, slide_encoding="standard", course_pack=False, force=False):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         self.use_topic_folders = True  # Organize by topic
+        
+        # Topics are generated in a process pool when processes > 1 (0 = all cores)
+        self.processes = processes or os.cpu_count() or 1
+        
+        # Slide PNGs and PDFs are rendered on a process pool shared by the whole run (0 = all cores)
+        self.render_processes = render_processes or os.cpu_count() or 1
+        self._render_pool = None
+        
+        # PNG profile for slide images (SLIDE_PNG_PROFILES): keep "standard" when the
+        # slides are downloaded, "fast" when they only feed the video encoder
+        if slide_encoding not in SLIDE_PNG_PROFILES:
+            raise ValueError(f"Unknown slide encoding '{slide_encoding}', "
+                             f"expected one of {sorted(SLIDE_PNG_PROFILES)}")
+        self.slide_encoding = slide_encoding
+        
+        # Also merge the summary and every topic PDF into one bookmarked course pack
+        self.course_pack = course_pack
+        
+        # Outputs whose inputs are unchanged since the last run are left alone
+        # (see BUILD_MANIFEST); force rebuilds everything, bypassing the caches
+        self.force = force
+        self._manifest = {}
+        
+        # Voice settings for neural TTS
+        self.voice = "en-US-GuyNeural"  # Male voice, very natural
+        self.voice_rate = "-5%"
+        
+        # All topics' scripts are synthesized together, this many at a time
+        self.tts_concurrency = tts_concurrency
+        self.tts_timeout = tts_timeout  # seconds per edge-tts call
+        self._audio_engines = {}  # base name -> TTS engine that produced the audio
+        self._reused_speech = set()  # MP3 paths served from the audio cache this run
+        
+        # H.264 tuned for still images; slides are muxed with the audio in one pass
+        self.video_codec = "libx264"
+        
+        # Content-addressed store of previously rendered artifacts (all but audio)
+        self.cache = ArtifactCache(os.path.join(output_dir, ".artifact_cache")) if use_cache else None
+        
+        # Synthesized speech, reused whenever the same script is voiced the same way;
+        # the only store for audio, keyed by engine and bounded in size
+        self.audio_cache = AudioCache(os.path.join(output_dir, ".audio_cache"),
+                                      max_bytes=audio_cache_bytes) if use_cache else None
+        
+        # Rendered slide PNGs - generic slides repeat across topics and runs
+        self.slide_cache = ArtifactCache(os.path.join(output_dir, ".slide_cache")) if use_cache else None
     
-    def generate_all(self, content_data, subject_name):
-        """Generate all file types for the content"""
+    def generate_all(self, content_data, subject_name, progress_callback=None, formats=None):
+        """Generate the requested file types for the content
+
+        formats limits the run to some of ppt, pdf, audio and video (see
+        resolve_formats); stages only the skipped formats need are skipped too.
+        progress_callback(topic_index, artifact, status) is called as each
+        artifact starts ("running") and finishes ("done"). A topic whose files
+        cannot be built (e.g. a content field fails to generate) is reported
+        as "failed" and listed in "failed_topics"; the other topics go on.
+        """
+        formats = resolve_formats(formats)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_subject = self._sanitize_filename(subject_name)
         
         generated_files = {
             "subject": subject_name,
             "timestamp": timestamp,
-            "files": []
+            "formats": list(formats),
+            "files": [],
+            "failed_topics": [],
+            "cache": {"hits": 0, "misses": 0}
         }
         
+        def report(topic_index, artifact, status):
+            if progress_callback:
+                progress_callback(topic_index, artifact, status)
+        
+        def fail(idx, content, error):
+            message = (str(error) or type(error).__name__)[:200]
+            print(f"   ⚠️ File generation failed for {content['topic']}: {message}")
+            generated_files["failed_topics"].append({"topic": content["topic"], "unit": content["unit"],
+                                                     "error": message})
+            report(idx - 1, "topic", "failed")
+        
+        self._manifest = {} if self.force else self._load_manifest()
+        
+        # Start every topic's neural TTS at once; the audio stages pick up the results
+        speech_jobs = {}
+        for idx, content in enumerate(content_data if "audio" in formats else (), 1):
+            topic_folder, base_path = self._topic_paths(idx, content, safe_subject)
+            try:
+                if self._needs_build("audio", content, base_path) and not self._has_cached_speech(
+                        "edge-tts", content["audio_script"]):
+                    speech_jobs[idx] = (content["audio_script"], f"{base_path}.mp3")
+            except ContentFieldError:
+                continue  # The topic's audio stage fails the same way and reports it
+        speech = SpeechSynthesizer(self.voice, self.voice_rate,
+                                   concurrency=self.tts_concurrency, timeout=self.tts_timeout)
+        edge_audio = speech.start_batch(speech_jobs)
+        
         # Generate files for each topic
-        for idx, content in enumerate(content_data, 1):
-            topic_name = self._sanitize_filename(content["topic"])
-            
-            # Create topic folder
-            if self.use_topic_folders:
-                topic_folder = os.path.join(self.output_dir, f"Lecture_{idx}_{topic_name}")
-                os.makedirs(topic_folder, exist_ok=True)
-                base_path = os.path.join(topic_folder, topic_name)  # Full path including folder
-            else:
-                base_path = os.path.join(self.output_dir, f"{safe_subject}_{idx}_{topic_name}")
-            
-            files = {
-                "topic": content["topic"],
-                "unit": content["unit"],
-                "folder": topic_folder if self.use_topic_folders else None,
-                "files": {}
-            }
-            
-            print(f"\n[Generating files for: {content['topic']}]")
-            if self.use_topic_folders:
-                print(f"   Folder: {os.path.basename(topic_folder)}/")
-            
-            # Generate PPT
-            print("   [PPT] Creating PowerPoint...")
-            ppt_file = self.generate_ppt(content, base_path)
-            files["files"]["ppt"] = ppt_file
-            
-            # Generate PDF
-            print("   [PDF] Creating PDF notes...")
-            pdf_file = self.generate_pdf(content, base_path)
-            files["files"]["pdf"] = pdf_file
-            
-            # Generate Audio with dynamics
-            print("   [MP3] Creating audio lecture with voice dynamics...")
-            audio_file = self.generate_audio_with_dynamics(content, base_path)
-            files["files"]["audio"] = audio_file
-            
-            # Generate Video
-            print("   [MP4] Creating video...")
-            video_file = self.generate_video(content, base_path)
-            files["files"]["video"] = video_file
-            
+        if self.processes > 1 and len(content_data) > 1:
+            topic_results = self._generate_topics_parallel(content_data, safe_subject, report, fail,
+                                                           edge_audio, formats)
+            summary_build = None
+        else:
+            # Only slides and topic PDFs are rendered on the pool - no work, no processes
+            renders = "video" in formats or ("pdf" in formats and len(content_data) > 1)
+            if self.render_processes > 1 and renders:
+                self._render_pool = ProcessPoolExecutor(max_workers=self.render_processes)
+            try:
+                # PDFs only need the content - start every topic's build and the summary now
+                pdf_builds = (self._start_pdf_builds(content_data, safe_subject)
+                              if "pdf" in formats else {})
+                summary_build = (self._render_pool.submit(_build_summary_in_worker, self, content_data,
+                                                          safe_subject, timestamp)
+                                 if self._render_pool is not None else None)
+                topic_results = []
+                for idx, content in enumerate(content_data, 1):
+                    try:
+                        topic_results.append(self._generate_topic(idx, content, safe_subject, report,
+                                                                  edge_audio.get(idx),
+                                                                  pdf_builds.get(idx), formats))
+                    except Exception as e:
+                        fail(idx, content, e)
+                        topic_results.append(None)
+            finally:
+                if self._render_pool is not None:
+                    self._render_pool.shutdown()
+                    self._render_pool = None
+        
+        for files, cache_stats in filter(None, topic_results):
             generated_files["files"].append(files)
+            generated_files["cache"]["hits"] += cache_stats["hits"]
+            generated_files["cache"]["misses"] += cache_stats["misses"]
+        
+        self._save_manifest(content_data, safe_subject, topic_results)
         
         # Generate summary document
         print("\n[SUMMARY] Creating summary document...")
-        summary_file = self.generate_summary(content_data, safe_subject, timestamp)
+        built = [content for content, result in zip(content_data, topic_results) if result is not None]
+        summary_file = None
+        if summary_build is not None and len(built) == len(content_data):
+            try:
+                summary_file = summary_build.result()
+            except Exception as e:
+                # Like the other prefetches: a failed build is dropped and redone here
+                print(f"   ⚠️ Prefetched summary failed ({e}), building it again")
+        if summary_file is None:
+            summary_file = self.generate_summary(built, safe_subject, timestamp)
         generated_files["summary"] = summary_file
         
+        if self.course_pack and "pdf" not in formats:
+            print("\n⚠️ Course pack needs the topic PDFs, skipping it (pdf not requested)")
+        elif self.course_pack:
+            print("\n[COURSE PACK] Merging PDFs into one course pack...")
+            generated_files["course_pack"] = self.generate_course_pack(generated_files, safe_subject,
+                                                                       timestamp)
+        
         return generated_files
     
-    def generate_ppt(self, content, base_name):
-        """Generate PowerPoint presentation"""
-        filename = f"{base_name}.pptx"
+    def _start_pdf_builds(self, content_data, safe_subject):
+        """Queue every uncached topic PDF on the render pool; {topic index: Future}
         
-        prs = Presentation()
-        prs.slide_width = Inches(10)
-        prs.slide_height = Inches(7.5)
+        Each future resolves to a finished temporary PDF that the topic's pdf
+        stage moves into place.
+        """
+        if self._render_pool is None or len(content_data) < 2:
+            return {}
         
-        # Title slide layout
-        title_slide_layout = prs.slide_layouts[0]
-        slide = prs.slides.add_slide(title_slide_layout)
-        title = slide.shapes.title
-        subtitle = slide.placeholders[1]
+        builds = {}
+        for idx, content in enumerate(content_data, 1):
+            topic_folder, base_path = self._topic_paths(idx, content, safe_subject)
+            try:
+                if self._needs_build("pdf", content, base_path):
+                    builds[idx] = self._render_pool.submit(_build_pdf_in_worker, self, content,
+                                                           f"{base_path}.part")
+            except ContentFieldError:
+                continue  # The topic's pdf stage fails the same way and reports it
+        return builds
+    
+    def _topic_paths(self, idx, content, safe_subject):
+        """Create the topic folder and return (folder, base path for its files)
         
-        title.text = content["topic"]
-        subtitle.text = f"{content['unit']}\nDifficulty: {content['difficulty']}"
+        Topics planned as part of a semester carry their position in the whole
+        course ("topic_number"), which is used instead of the position in this run.
+        """
+        topic_name = self._sanitize_filename(content["topic"])
+        idx = content.get("topic_number", idx)
         
-        # Add content slides
-        for slide_data in content["ppt_slides"]:
-            bullet_slide_layout = prs.slide_layouts[1]
-            slide = prs.slides.add_slide(bullet_slide_layout)
+        if self.use_topic_folders:
+            topic_folder = os.path.join(self.output_dir, f"Lecture_{idx}_{topic_name}")
+            os.makedirs(topic_folder, exist_ok=True)
+            base_path = os.path.join(topic_folder, topic_name)  # Full path including folder
+            return topic_folder, base_path
+        
+        return None, os.path.join(self.output_dir, f"{safe_subject}_{idx}_{topic_name}")
+    
+    def _generate_topic(self, idx, content, safe_subject, report, edge_audio=None, pdf_build=None,
+                        formats=tuple(ARTIFACT_EXTENSIONS)):
+        """Generate the resolved formats (PPT, PDF, audio, video) for one topic
+        
+        edge_audio is this topic's neural TTS result from the course-wide
+        batch: a Future, its resolved value, or None to synthesize inline.
+        pdf_build is a Future for a PDF already rendering on the pool, if any.
+        """
+        cache_stats = {"hits": 0, "misses": 0}
+        topic_folder, base_path = self._topic_paths(idx, content, safe_subject)
+        
+        files = {
+            "topic": content["topic"],
+            "unit": content["unit"],
+            "folder": topic_folder,
+            "files": {},
+            "cached": [],
+            "up_to_date": []
+        }
+        
+        print(f"\n[Generating files for: {content['topic']}]")
+        if self.use_topic_folders:
+            print(f"   Folder: {os.path.basename(topic_folder)}/")
+        
+        def stage(artifact, message, builder):
+            def run(results):
+                print(f"   {message}")
+                report(idx - 1, artifact, "running")
+                output = self._build_artifact(artifact, builder, content, base_path, files)
+                report(idx - 1, artifact, "done")
+                return output
+            return run
+        
+        # PPT, PDF, slide images and TTS are independent; only the video
+        # needs the audio and the slide images
+        graph = StageGraph()
+        if "ppt" in formats:
+            graph.add("ppt", stage("ppt", "[PPT] Creating PowerPoint...", self.generate_ppt))
+        
+        def build_pdf(content, base_name):
+            if pdf_build is None:
+                return self.generate_pdf(content, base_name)
+            filename = f"{base_name}.pdf"
+            os.replace(pdf_build.result(), filename)
+            return filename
+        
+        if "pdf" in formats:
+            graph.add("pdf", stage("pdf", "[PDF] Creating PDF notes...", build_pdf))
+        if "video" in formats:
+            graph.add("slides", lambda results: self.render_slide_images(content, base_path))
+        
+        def synthesize_audio(content, base_name):
+            edge_result = (edge_audio.result() if isinstance(edge_audio, (Future, _SharedSpeechResult))
+                           else edge_audio)
+            return self.generate_audio_with_dynamics(content, base_name, edge_result)
+        
+        if "audio" in formats:
+            graph.add("audio", stage("audio", "[MP3] Creating audio lecture with voice dynamics...",
+                                     synthesize_audio))
+        
+        def build_video(results):
+            render = partial(self.generate_video, slide_images=results["slides"])
+            return stage("video", "[MP4] Creating video...", render)(results)
+        
+        if "video" in formats:
+            graph.add("video", build_video, deps=("audio", "slides"))
+        
+        results, timings = graph.run()
+        for artifact in formats:
+            files["files"][artifact] = results[artifact]
+        files["slides"] = results.get("slides", [])  # Rendered once; also serves as previews
+        if f"{base_path}.mp3" in self._reused_speech:
+            self._reused_speech.discard(f"{base_path}.mp3")
+            files["cached"].append("audio")
+        files["cached"] = [artifact for artifact in formats if artifact in files["cached"]]
+        files["up_to_date"] = [artifact for artifact in formats if artifact in files["up_to_date"]]
+        
+        if "audio" not in formats:
+            files["audio_engine"] = None
+        elif "audio" in files["up_to_date"]:
+            files["audio_engine"] = "up_to_date"
+        else:
+            files["audio_engine"] = self._audio_engines.pop(base_path, None)
+        files["timings"] = {name: timing["seconds"] for name, timing in timings.items()}
+        files["critical_path"] = graph.critical_path(timings)
+        
+        if self.cache is not None:
+            cache_stats["hits"] = len(files["cached"])
+            cache_stats["misses"] = (len(formats) - cache_stats["hits"]
+                                     - len(files["up_to_date"]))
+        
+        report(idx - 1, "topic", "done")
+        return files, cache_stats
+    
+    def _generate_topics_parallel(self, content_data, safe_subject, report, fail, edge_audio, formats):
+        """Spread topics across a bounded process pool, keeping syllabus order
+        
+        Topics that raise are passed to fail(idx, content, error) and left as None.
+        """
+        workers = min(self.processes, len(content_data))
+        print(f"\n[PARALLEL] Generating {len(content_data)} topics on {workers} processes...")
+        
+        results = [None] * len(content_data)
+        with Manager() as manager, ProcessPoolExecutor(max_workers=workers) as pool:
+            # Topics start without waiting for their TTS; the audio stage waits in the worker
+            shared_results = manager.dict()
+            shared_audio = {}
+            for idx, future in edge_audio.items():
+                shared_audio[idx] = _SharedSpeechResult(shared_results, manager.Event(), idx)
+                future.add_done_callback(shared_audio[idx].set_from)
             
-            title = slide.shapes.title
-            body = slide.placeholders[1]
+            futures = {}
+            for idx, content in enumerate(content_data, 1):
+                future = pool.submit(_generate_topic_in_worker, self, idx, content, safe_subject,
+                                     shared_audio.get(idx), formats)
+                futures[future] = idx
+                report(idx - 1, "topic", "running")
             
-            title.text = slide_data["title"]
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    files, cache_stats = future.result()
+                except Exception as e:
+                    fail(idx, content_data[idx - 1], e)
+                    continue
+                # Worker processes cannot call back into this one, so per-artifact
+                # progress is reported when the whole topic comes back
+                for artifact in files["files"]:
+                    report(idx - 1, artifact, "done")
+                report(idx - 1, "topic", "done")
+                results[idx - 1] = (files, cache_stats)
+        
+        return results
+    
+    def _cache_key(self, artifact, content):
+        """Hash of the content fields and settings an artifact is rendered from"""
+        inputs = {field: content[field] for field in ARTIFACT_INPUTS[artifact]}
+        return content_hash(artifact, inputs, self._artifact_settings(artifact))
+    
+    def _is_cached(self, artifact, content):
+        if self.cache is None or self.force or artifact == "audio":
+            return False
+        key = self._cache_key(artifact, content)
+        return os.path.isfile(self.cache.path_for(key, ARTIFACT_EXTENSIONS[artifact]))
+    
+    def _needs_build(self, artifact, content, base_path):
+        """Whether the artifact is neither up to date on disk nor in the cache"""
+        return (not self._is_up_to_date(artifact, content, base_path)
+                and not self._is_cached(artifact, content))
+    
+    def _build_artifact(self, artifact, builder, content, base_path, files):
+        """Run builder unless the output is up to date or the artifact cache holds it"""
+        if self._is_up_to_date(artifact, content, base_path):
+            files["up_to_date"].append(artifact)
+            print(f"      Up to date: {os.path.basename(base_path)}{ARTIFACT_EXTENSIONS[artifact]}")
+            return f"{base_path}{ARTIFACT_EXTENSIONS[artifact]}"
+        
+        if self.cache is None or artifact == "audio":
+            # Audio has its own engine-keyed, size-bounded cache (see generate_audio_with_dynamics)
+            return builder(content, base_path)
+        
+        key = self._cache_key(artifact, content)
+        target = f"{base_path}{ARTIFACT_EXTENSIONS[artifact]}"
+        
+        if not self.force and self.cache.fetch(key, target):
+            files["cached"].append(artifact)
+            print(f"      Reused cached {artifact} ({key[:12]})")
+            return target
+        
+        # A previous hit may have hardlinked this path to the cache - never write through it
+        if os.path.isfile(target):
+            os.remove(target)
+        output = builder(content, base_path)
+        # A video muxed from fallback audio is not kept - it is rebuilt once edge-tts is back
+        if (output == target and os.path.isfile(output) and os.path.getsize(output) > 0
+                and (artifact != "video" or self._has_neural_audio(base_path, files))):
+            self.cache.store(key, output, replace=self.force)
+        return output
+    
+    def _has_neural_audio(self, base_path, files):
+        """Whether the topic's MP3 is edge-tts speech (recorded as up to date, or made this run)"""
+        return "audio" in files["up_to_date"] or self._audio_engines.get(base_path) == "edge-tts"
+    
+    def _manifest_path(self):
+        return os.path.join(self.output_dir, BUILD_MANIFEST)
+    
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path(), encoding='utf-8') as f:
+                return json.load(f).get("artifacts", {})
+        except (OSError, ValueError):
+            return {}
+    
+    def _manifest_entry(self, path, key):
+        stat = os.stat(path)
+        return {"key": key, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    
+    def _is_up_to_date(self, artifact, content, base_path):
+        """Whether the last run built this exact output and nobody has touched it since"""
+        if self.force:
+            return False
+        target = f"{base_path}{ARTIFACT_EXTENSIONS[artifact]}"
+        entry = self._manifest.get(os.path.relpath(target, self.output_dir))
+        if entry is None or entry["key"] != self._cache_key(artifact, content):
+            return False
+        try:
+            return self._manifest_entry(target, entry["key"]) == entry
+        except OSError:
+            return False
+    
+    def _save_manifest(self, content_data, safe_subject, topic_results):
+        """Record input hashes and outputs of this run next to the output
+        
+        Failed topics (None in topic_results) keep their old entries. Only
+        real artifacts are recorded - fallbacks such as a script instead
+        of audio, audio from a fallback TTS engine (and the video muxed from
+        it) or a video package are retried on the next run. Entries for
+        formats this run did not build are kept as they were, and so are
+        entries other jobs saved since this run started.
+        """
+        updates = {}  # relative path -> new entry, or None to drop it
+        for idx, (content, result) in enumerate(zip(content_data, topic_results), 1):
+            if result is None:
+                continue
+            files, _ = result
+            topic_folder, base_path = self._topic_paths(idx, content, safe_subject)
+            neural_audio = files.get("audio_engine") in ("edge-tts", "up_to_date")
+            for artifact in files["files"]:
+                target = f"{base_path}{ARTIFACT_EXTENSIONS[artifact]}"
+                relative = os.path.relpath(target, self.output_dir)
+                updates[relative] = None
+                if artifact in ("audio", "video") and not neural_audio:
+                    continue
+                if files["files"].get(artifact) == target and os.path.isfile(target):
+                    updates[relative] = self._manifest_entry(target, self._cache_key(artifact, content))
+        
+        with _manifest_lock:
+            # Re-read so entries saved by other jobs since we started are kept
+            manifest = self._load_manifest()
+            for relative, entry in updates.items():
+                if entry is None:
+                    manifest.pop(relative, None)
+                else:
+                    manifest[relative] = entry
             
-            tf = body.text_frame
-            for bullet in slide_data["bullets"]:
-                p = tf.add_paragraph()
-                p.text = bullet
-                p.level = 0
+            temp = f"{self._manifest_path()}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump({"render_version": self.RENDER_VERSION, "artifacts": manifest}, f, indent=2,
+                          sort_keys=True)
+            os.replace(temp, self._manifest_path())
+        self._manifest = manifest
+    
+    def _artifact_settings(self, artifact):
+        """Generator settings that change the rendered output of an artifact"""
+        settings = {"render_version": self.RENDER_VERSION}
+        if artifact in ("audio", "video"):
+            settings.update({"voice": self.voice, "voice_rate": self.voice_rate})
+        if artifact == "audio":
+            # Only edge-tts audio is recorded as built (see _save_manifest)
+            settings["tts_engine"] = "edge-tts"
+        if artifact == "video":
+            # Only videos muxed from neural speech are cached
+            settings.update({"video_codec": self.video_codec, "tts_engine": "edge-tts"})
+        return settings
+    
+    def generate_ppt(self, content, base_name):
+        """Generate PowerPoint presentation"""
+        filename = f"{base_name}.pptx"
+        
+        # Every deck starts from the shared master, cloned in memory
+        prs = deck_template.new_deck()
+        
+        # Title slide
+        deck_template.add_slide(prs, deck_template.TITLE_LAYOUT, content["topic"],
+                                [content["unit"], f"Difficulty: {content['difficulty']}"])
+        
+        # Add content slides (the body keeps its leading empty paragraph)
+        for slide_data in content["ppt_slides"]:
+            deck_template.add_slide(prs, deck_template.BULLET_LAYOUT, slide_data["title"],
+                                    [""] + list(slide_data["bullets"]))
         
         # Save
         prs.save(filename)
@@ -134,34 +718,10 @@ class FileGenerator:
                               topMargin=72, bottomMargin=18)
         
         story = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor='#667eea',
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor='#764ba2',
-            spaceAfter=12,
-            spaceBefore=12
-        )
-        
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['BodyText'],
-            fontSize=11,
-            alignment=TA_JUSTIFY,
-            spaceAfter=12
-        )
+        styles = _pdf_styles()
+        title_style = styles["title"]
+        heading_style = styles["heading"]
+        body_style = styles["body"]
         
         # Title
         story.append(Paragraph(content["topic"], title_style))
@@ -195,45 +755,118 @@ class FileGenerator:
         return filename
 
     
-    def generate_audio_with_dynamics(self, content, base_name):
-        """Generate audio with human-like voice using Microsoft Edge TTS (neural voices)"""
+    def generate_audio_with_dynamics(self, content, base_name, edge_result=None):
+        """Generate audio with human-like voice using Microsoft Edge TTS (neural voices)
+        
+        edge_result is the outcome of a SpeechSynthesizer batch for this topic
+        (finished temp MP3 path, or the Exception edge-tts raised). Without it
+        edge-tts is called inline.
+        """
         filename = f"{base_name}.mp3"
         
         # Get the script - use clean text without SSML for edge-tts
         script = content["audio_script"]
         
+        # Never write through a hardlink into one of the caches
+        if os.path.lexists(filename):
+            os.remove(filename)
+        
+        if self._reuse_cached_speech("edge-tts", script, filename):
+            print("      ✅ Reused cached neural voice audio")
+            if isinstance(edge_result, str) and os.path.exists(edge_result):
+                os.remove(edge_result)
+            self._audio_engines[base_name] = "edge-tts"
+            return filename
+        
+        # Inline calls report to the shared breaker here; batch calls already did
+        breaker = get_breaker("edge-tts", self.voice) if edge_result is None else None
+        
         try:
-            import asyncio
-            import edge_tts
+            if breaker is not None and not breaker.allow():
+                raise CircuitOpenError("edge-tts is marked unavailable")
             
-            print("      Using Microsoft neural voice (sounds more human)...")
-            
-            # Use Microsoft's neural voice (sounds very natural)
-            # Options: en-US-AriaNeural (female), en-US-GuyNeural (male), en-US-JennyNeural (female)
-            voice = "en-US-GuyNeural"  # Male voice, very natural
-            
-            # Generate audio asynchronously - edge-tts handles prosody automatically
-            async def generate():
-                communicate = edge_tts.Communicate(script, voice, rate="-5%", pitch="+0Hz")
-                await communicate.save(filename)
-            
-            # Run the async function
-            asyncio.run(generate())
+            if edge_result is None:
+                import asyncio
+                import edge_tts
+                
+                print("      Using Microsoft neural voice (sounds more human)...")
+                
+                # Use Microsoft's neural voice (sounds very natural)
+                # Options: en-US-AriaNeural (female), en-US-GuyNeural (male), en-US-JennyNeural (female)
+                voice = self.voice
+                
+                # Generate audio asynchronously - edge-tts handles prosody automatically
+                async def generate():
+                    communicate = edge_tts.Communicate(script, voice, rate=self.voice_rate, pitch="+0Hz")
+                    await asyncio.wait_for(communicate.save(filename), timeout=self.tts_timeout)
+                
+                # Run the async function
+                asyncio.run(generate())
+                breaker.record_success()
+            elif isinstance(edge_result, Exception):
+                raise edge_result
+            else:
+                # Synthesized concurrently with the rest of the course
+                os.replace(edge_result, filename)
             
+            self._remember_speech("edge-tts", script, filename)
+            self._audio_engines[base_name] = "edge-tts"
             print(f"      ✅ Natural-sounding audio created")
             return filename
             
-        except ImportError:
+        except CircuitOpenError:
+            print("      ⚠️ Neural voice recently unreachable, skipping to fallback...")
+            return self._generate_with_pyttsx3(content, base_name, script)
+        except ImportError as e:
+            if breaker is not None:
+                breaker.record_failure(e)
             print("      ⚠️ edge-tts not available, trying pyttsx3...")
             return self._generate_with_pyttsx3(content, base_name, script)
         except Exception as e:
+            if breaker is not None:
+                breaker.record_failure(e)
             print(f"      ⚠️ Neural voice failed ({str(e)[:50]}), using fallback...")
             return self._generate_with_pyttsx3(content, base_name, script)
     
+    def _speech_key(self, engine, script):
+        """Audio cache key: script text + voice + rate + engine"""
+        voice, rate = {
+            "edge-tts": (self.voice, self.voice_rate),
+            "pyttsx3": ("david/zira", 160),
+            "gtts": ("en", "normal"),
+        }[engine]
+        return self.audio_cache.key(script, voice, rate, engine)
+    
+    def _has_cached_speech(self, engine, script):
+        return (self.audio_cache is not None and not self.force
+                and self.audio_cache.contains(self._speech_key(engine, script)))
+    
+    def _reuse_cached_speech(self, engine, script, filename):
+        if self.audio_cache is None or self.force:
+            return False
+        if not self.audio_cache.get(self._speech_key(engine, script), filename):
+            return False
+        self._reused_speech.add(filename)
+        return True
+    
+    def _remember_speech(self, engine, script, filename):
+        if self.audio_cache is not None:
+            self.audio_cache.put(self._speech_key(engine, script), filename)
+    
     def _generate_with_pyttsx3(self, content, base_name, script):
         """Fallback: Generate with pyttsx3 (offline but less natural)"""
         filename = f"{base_name}.mp3"
         
+        if self._reuse_cached_speech("pyttsx3", script, filename):
+            print("      ✅ Reused cached offline voice audio")
+            self._audio_engines[base_name] = "pyttsx3"
+            return filename
+        
+        breaker = get_breaker("pyttsx3")
+        if not breaker.allow():
+            print("      ⚠️ pyttsx3 recently failed, using gTTS...")
+            return self.generate_audio(content, base_name)
+        
         try:
             import pyttsx3
             
@@ -257,10 +890,14 @@ class FileGenerator:
             engine.save_to_file(script, filename)
             engine.runAndWait()
             
+            breaker.record_success()
+            self._remember_speech("pyttsx3", script, filename)
+            self._audio_engines[base_name] = "pyttsx3"
             print(f"      ✅ Audio created with offline voice")
             return filename
             
         except Exception as e:
+            breaker.record_failure(e)
             print(f"      ⚠️ pyttsx3 failed, using gTTS...")
             return self.generate_audio(content, base_name)
     
@@ -271,11 +908,28 @@ class FileGenerator:
         # Use the actual script content
         script = content["audio_script"]
         
+        if os.path.lexists(filename):
+            os.remove(filename)
+        
+        if self._reuse_cached_speech("gtts", script, filename):
+            print("      ✅ Reused cached gTTS audio")
+            self._audio_engines[base_name] = "gtts"
+            return filename
+        
         # Generate audio
+        breaker = get_breaker("gtts")
         try:
-            tts = gTTS(text=script, lang='en', slow=False)
+            if not breaker.allow():
+                raise CircuitOpenError("gTTS is marked unavailable")
+            tts = gTTS(text=script, lang='en', slow=False, timeout=self.tts_timeout)
             tts.save(filename)
+            breaker.record_success()
+            self._remember_speech("gtts", script, filename)
+            self._audio_engines[base_name] = "gtts"
         except Exception as e:
+            if not isinstance(e, CircuitOpenError):
+                breaker.record_failure(e)
+            self._audio_engines[base_name] = "script"
             print(f"      ⚠️ Audio generation failed: {e}")
             # Create text file as fallback
             with open(filename.replace('.mp3', '_SCRIPT.txt'), 'w') as f:
@@ -284,20 +938,66 @@ class FileGenerator:
         
         return filename
     
-    def generate_video(self, content, base_name):
-        """Generate actual MP4 video file - SIMPLE WORKING VERSION"""
-        video_filename = f"{base_name}.mp4"
+    def render_slide_images(self, content, base_name):
+        """Render one PNG per slide into the topic's slides/ folder
         
-        # Create slide images
+        This is the only place slides are drawn; the video, the video package,
+        the video plan and previews all use the returned paths.
+        """
         frames_dir = os.path.join(os.path.dirname(base_name), "slides")
         os.makedirs(frames_dir, exist_ok=True)
         
         print("      Creating slide images...")
-        slide_images = []
-        for idx, slide in enumerate(content["ppt_slides"]):
-            img_path = os.path.join(frames_dir, f"slide_{idx:02d}.png")
-            self._create_slide_image(slide, img_path)
-            slide_images.append(img_path)
+        slides = content["ppt_slides"]
+        slide_images = [os.path.join(frames_dir, f"slide_{idx:02d}.png") for idx in range(len(slides))]
+        
+        # Identical slides are drawn once: reuse cached renders, render each new one once
+        to_render = {}  # cache key (or path without a cache) -> (slide, paths)
+        reused = 0
+        for slide, img_path in zip(slides, slide_images):
+            if os.path.lexists(img_path):
+                os.remove(img_path)  # May be a hardlink into the cache
+            key = self._slide_key(slide) if self.slide_cache is not None else img_path
+            if self.slide_cache is not None and not self.force and self.slide_cache.fetch(key, img_path):
+                reused += 1
+                continue
+            to_render.setdefault(key, (slide, []))[1].append(img_path)
+        
+        renders = [(slide, paths[0]) for slide, paths in to_render.values()]
+        if self._render_pool is not None and len(renders) > 1:
+            futures = [self._render_pool.submit(_render_slide_in_worker, self, slide, img_path)
+                       for slide, img_path in renders]
+            for future in futures:
+                future.result()
+        else:
+            for slide, img_path in renders:
+                self._create_slide_image(slide, img_path)
+        
+        for key, (slide, paths) in to_render.items():
+            if self.slide_cache is not None and os.path.isfile(paths[0]):
+                self.slide_cache.store(key, paths[0], replace=self.force)
+            for duplicate in paths[1:]:
+                link_or_copy(paths[0], duplicate)
+        
+        if reused:
+            print(f"      Reused {reused} of {len(slides)} slides from the slide cache")
+        
+        return slide_images
+    
+    def _slide_key(self, slide):
+        """Slide cache key: the slide's text and number plus the look it is drawn with"""
+        inputs = {field: slide.get(field) for field in ("title", "bullets", "slide_number")}
+        settings = {"theme": SLIDE_THEME, "size": SLIDE_SIZE, "encoding": self.slide_encoding,
+                    "render_version": self.RENDER_VERSION}
+        return self.slide_cache.key("slide", inputs, settings)
+    
+    def generate_video(self, content, base_name, slide_images=None):
+        """Generate actual MP4 video file - SIMPLE WORKING VERSION"""
+        video_filename = f"{base_name}.mp4"
+        
+        # Create slide images
+        if slide_images is None:
+            slide_images = self.render_slide_images(content, base_name)
         
         # Get audio file
         audio_file = f"{base_name}.mp3"
@@ -307,70 +1007,34 @@ class FileGenerator:
             return self._create_video_package(content, base_name, slide_images, audio_file)
         
         try:
-            import cv2
-            import numpy as np
-            from pydub import AudioSegment
-            import wave
-            
-            print("      Creating video with OpenCV...")
-            
             # Get audio duration
-            try:
-                audio = AudioSegment.from_mp3(audio_file)
-                total_duration_ms = len(audio)
-                total_duration_sec = total_duration_ms / 1000.0
-            except:
+            total_duration_sec = self._audio_duration(audio_file)
+            if total_duration_sec is None:
                 # Fallback: 3 seconds per slide
                 total_duration_sec = len(slide_images) * 3
             
-            # Calculate FPS and frames per slide
-            fps = 1  # 1 frame per second (since slides are static)
-            duration_per_slide = total_duration_sec / len(slide_images)
-            
-            # Read first image to get dimensions
-            first_img = cv2.imread(slide_images[0])
-            height, width, layers = first_img.shape
+            # Give each slide the stretch of narration that talks about it
+            segments = content.get("video_content", {}).get("segments")
+            cues = build_cues(content.get("audio_script", ""), content["ppt_slides"],
+                              total_duration_sec, segments)
             
-            # Create video writer (without audio first)
-            temp_video = video_filename.replace('.mp4', '_temp.mp4')
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            video_writer = cv2.VideoWriter(temp_video, fourcc, fps, (width, height))
-            
-            # Write each slide for its duration
-            for img_path in slide_images:
-                img = cv2.imread(img_path)
-                frames_to_write = int(duration_per_slide * fps)
-                for _ in range(max(1, frames_to_write)):
-                    video_writer.write(img)
-            
-            video_writer.release()
-            
-            # Now combine video with audio using ffmpeg
-            print("      Adding audio to video...")
-            import subprocess
-            
-            cmd = [
-                'ffmpeg', '-y',
-                '-i', temp_video,
-                '-i', audio_file,
-                '-c:v', 'copy',
-                '-c:a', 'aac',
-                '-shortest',
-                video_filename
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            # Clean up temp file
-            if os.path.exists(temp_video):
-                os.remove(temp_video)
+            # One ffmpeg pass: slides + exact durations in, H.264 + AAC out
+            print("      Encoding video with ffmpeg...")
+            result = self._encode_slideshow(slide_images, cues, audio_file, video_filename)
+            if result.returncode != 0 and "unknown keyword 'option'" in result.stderr:
+                # FFmpeg before 5.0 has no per-file concat options; slides then
+                # change on its default 25 fps grid, up to 40 ms off their cues
+                print("      ffmpeg is older than 5.0, encoding on 25 fps cue timing...")
+                result = self._encode_slideshow(slide_images, cues, audio_file, video_filename,
+                                                exact_timing=False)
             
             if result.returncode == 0 and os.path.exists(video_filename):
                 file_size = os.path.getsize(video_filename) / (1024 * 1024)  # MB
                 print(f"      ✅ Video created: {os.path.basename(video_filename)} ({file_size:.1f} MB)")
                 return video_filename
             else:
-                raise Exception("ffmpeg not available")
+                error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+                raise Exception(f"ffmpeg failed: {error}")
                 
         except ImportError as e:
             print(f"      ⚠️ Missing library: {str(e)[:50]}")
@@ -385,22 +1049,72 @@ class FileGenerator:
             print("         Creating video package instead")
             return self._create_video_package(content, base_name, slide_images, audio_file)
     
+    def _audio_duration(self, audio_file):
+        """Audio length in seconds from the MP3 frame headers, decoding only as a fallback"""
+        duration = mp3_duration(audio_file)
+        if duration is not None:
+            return duration
+        
+        try:
+            from pydub import AudioSegment
+            audio = AudioSegment.from_mp3(audio_file)
+            return len(audio) / 1000.0
+        except Exception:
+            return None
+    
+    def _encode_slideshow(self, slide_images, cues, audio_file, video_filename, exact_timing=True):
+        """Encode still slides on a cue list and mux audio in one ffmpeg run
+        
+        The slide list is fed to ffmpeg's concat demuxer on stdin, so each slide
+        becomes a single frame shown for exactly its cue duration (no temp files).
+        exact_timing uses the concat "option" directive, which needs FFmpeg 5.0+.
+        """
+        lines = ["ffconcat version 1.0"]
+        for img_path, cue in zip(slide_images, cues):
+            # Explicit file: URL - relative to pipe:0 the path would not resolve
+            safe_path = os.path.abspath(img_path).replace("'", "'\\''")
+            lines.append(f"file 'file:{safe_path}'")
+            # Millisecond time base for the image (its default 25 fps rounds cues to 40 ms)
+            if exact_timing:
+                lines.append("option framerate 1000")
+            lines.append(f"duration {cue['duration']:.3f}")
+        # The concat demuxer ignores the last duration unless the file is repeated
+        lines.extend(lines[-3:-1] if exact_timing else lines[-2:-1])
+        
+        cmd = [
+            'ffmpeg', '-y',
+            '-f', 'concat', '-safe', '0', '-protocol_whitelist', 'file,pipe',
+            '-i', 'pipe:0',
+            '-i', audio_file,
+            '-map', '0:v', '-map', '1:a',
+            '-c:v', self.video_codec,
+            '-tune', 'stillimage',
+            '-pix_fmt', 'yuv420p',
+            '-vsync', 'vfr',
+            '-c:a', 'aac',
+            '-shortest',
+            '-movflags', '+faststart',
+            video_filename
+        ]
+        
+        return subprocess.run(cmd, input="\n".join(lines) + "\n", capture_output=True, text=True)
+    
     def _create_video_package(self, content, base_name, slide_images, audio_file):
-        """Create a package with slides and audio for manual video creation"""
-        package_dir = os.path.join(self.output_dir, f"{base_name}_VIDEO_PACKAGE")
+        """Create a package with slides and audio for manual video creation
+        
+        The audio and slides already sit in the topic folder, so the package
+        only lists them in a manifest; the ZIP download places them inside it.
+        """
+        package_dir = f"{base_name}_VIDEO_PACKAGE"
         os.makedirs(package_dir, exist_ok=True)
         
-        # Copy audio
-        import shutil
+        members = {}
         if os.path.exists(audio_file):
-            shutil.copy(audio_file, os.path.join(package_dir, "audio.mp3"))
-        
-        # Copy slides
-        slides_dir = os.path.join(package_dir, "slides")
-        os.makedirs(slides_dir, exist_ok=True)
+            members["audio.mp3"] = audio_file
         for idx, img in enumerate(slide_images):
             if os.path.exists(img):
-                shutil.copy(img, os.path.join(slides_dir, f"slide_{idx:02d}.png"))
+                members[f"slides/slide_{idx:02d}.png"] = img
+        write_package_manifest(package_dir, members)
         
         # Create instructions
         instructions = os.path.join(package_dir, "HOW_TO_CREATE_VIDEO.txt")
@@ -410,6 +1124,8 @@ class FileGenerator:
             f.write("FILES:\n")
             f.write("- audio.mp3: The lecture audio\n")
             f.write(f"- slides/: {len(slide_images)} slide images\n\n")
+            f.write("In the downloaded ZIP these files are inside this folder. In the\n")
+            f.write(f"generated folder they are the lecture's own files, listed in {PACKAGE_MANIFEST}.\n\n")
             f.write("OPTION 1: Use ffmpeg (command line)\n")
             f.write("Install ffmpeg, then run:\n")
             f.write("  ffmpeg -framerate 1/3 -i slides/slide_%02d.png -i audio.mp3 ")
@@ -433,15 +1149,7 @@ class FileGenerator:
     def _create_video_plan(self, content, base_name, video_filename, slide_images=None):
         """Create video plan as fallback"""
         if slide_images is None:
-            # Create slide images
-            frames_dir = os.path.join(self.output_dir, "temp_frames")
-            os.makedirs(frames_dir, exist_ok=True)
-            
-            slide_images = []
-            for idx, slide in enumerate(content["ppt_slides"]):
-                img_path = os.path.join(frames_dir, f"slide_{idx:02d}.png")
-                self._create_slide_image(slide, img_path)
-                slide_images.append(img_path)
+            slide_images = self.render_slide_images(content, base_name)
         
         video_plan_file = video_filename.replace('.mp4', '_VIDEO_PLAN.txt')
         with open(video_plan_file, 'w') as f:
@@ -464,37 +1172,11 @@ class FileGenerator:
     def _create_slide_image(self, slide_data, output_path):
         """Create beautiful, aesthetic slide image with modern design"""
         try:
-            from PIL import ImageDraw, ImageFont, ImageFilter
-            
-            # Create image with gradient background
-            img = Image.new('RGB', (1920, 1080), color='white')
-            draw = ImageDraw.Draw(img)
-            
-            # Create gradient background
-            for y in range(1080):
-                # Gradient from purple to blue
-                r = int(102 + (66 - 102) * y / 1080)
-                g = int(126 + (135 - 126) * y / 1080)
-                b = int(234 + (245 - 234) * y / 1080)
-                draw.line([(0, y), (1920, y)], fill=(r, g, b))
-            
-            # Add semi-transparent overlay for better text readability
-            overlay = Image.new('RGBA', (1920, 1080), (255, 255, 255, 30))
-            img = Image.alpha_composite(img.convert('RGBA'), overlay).convert('RGB')
-            
+            # Start from the shared gradient background - only the text is per-slide
+            img = _slide_background()
             draw = ImageDraw.Draw(img)
             
-            # Try to load nice fonts
-            try:
-                title_font = ImageFont.truetype("arial.ttf", 80)
-                text_font = ImageFont.truetype("arial.ttf", 45)
-            except:
-                try:
-                    title_font = ImageFont.truetype("C:\\Windows\\Fonts\\arial.ttf", 80)
-                    text_font = ImageFont.truetype("C:\\Windows\\Fonts\\arial.ttf", 45)
-                except:
-                    title_font = ImageFont.load_default()
-                    text_font = ImageFont.load_default()
+            title_font, text_font = _load_fonts(80, 45)
             
             # Draw decorative top bar
             draw.rectangle([(0, 0), (1920, 20)], fill=(255, 255, 255, 200))
@@ -529,7 +1211,7 @@ class FileGenerator:
             draw.text((1700, 1020), footer_text, fill='white', font=text_font)
             
             # Save
-            img.save(output_path, quality=95)
+            img.save(output_path, **SLIDE_PNG_PROFILES[self.slide_encoding])
             
         except Exception as e:
             print(f"      ⚠️ Aesthetic slide creation failed: {e}")
@@ -542,12 +1224,7 @@ class FileGenerator:
             img = Image.new('RGB', (1920, 1080), color='#667eea')
             draw = ImageDraw.Draw(img)
             
-            try:
-                title_font = ImageFont.truetype("arial.ttf", 60)
-                text_font = ImageFont.truetype("arial.ttf", 40)
-            except:
-                title_font = ImageFont.load_default()
-                text_font = ImageFont.load_default()
+            title_font, text_font = _load_fonts(60, 40)
             
             # Draw title
             draw.text((100, 100), slide_data['title'], fill='white', font=title_font)
@@ -559,7 +1236,7 @@ class FileGenerator:
                 draw.text((150, y_pos), bullet_text, fill='white', font=text_font)
                 y_pos += 100
             
-            img.save(output_path)
+            img.save(output_path, **SLIDE_PNG_PROFILES[self.slide_encoding])
             
         except Exception as e:
             print(f"      ⚠️ Simple slide creation failed: {e}")
@@ -573,26 +1250,10 @@ class FileGenerator:
                               topMargin=72, bottomMargin=18)
         
         story = []
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor='#667eea',
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
-        heading_style = ParagraphStyle(
-            'Heading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor='#764ba2',
-            spaceAfter=12
-        )
-        
-        body_style = styles['BodyText']
+        styles = _pdf_styles()
+        title_style = styles["title"]
+        heading_style = styles["summary_heading"]
+        body_style = styles["summary_body"]
         
         # Title
         story.append(Paragraph(f"Course Content Summary: {subject_name}", title_style))
@@ -613,12 +1274,20 @@ class FileGenerator:
             story.append(Paragraph(f"<b>Difficulty:</b> {content['difficulty']}", body_style))
             story.append(Spacer(1, 12))
             
+            # A topic built without slides (or objectives) may have them fail to generate
             story.append(Paragraph("<b>Learning Objectives:</b>", body_style))
-            for obj in content["learning_objectives"]:
-                story.append(Paragraph(f"• {obj}", body_style))
+            try:
+                for obj in content["learning_objectives"]:
+                    story.append(Paragraph(f"• {obj}", body_style))
+            except ContentFieldError:
+                story.append(Paragraph("Not available", body_style))
             
             story.append(Spacer(1, 12))
-            story.append(Paragraph(f"<b>Slides:</b> {len(content['ppt_slides'])} slides", body_style))
+            try:
+                slide_count = f"{len(content['ppt_slides'])} slides"
+            except ContentFieldError:
+                slide_count = "not available"
+            story.append(Paragraph(f"<b>Slides:</b> {slide_count}", body_style))
             story.append(Spacer(1, 20))
             
             if idx < len(content_data):
@@ -627,6 +1296,48 @@ class FileGenerator:
         doc.build(story)
         return filename
     
+    def generate_course_pack(self, generated_files, subject_name, timestamp):
+        """Merge the summary and the topic PDFs into one bookmarked PDF
+        
+        Pages are copied over as they are - nothing is laid out again.
+        """
+        try:
+            from pypdf import PdfReader, PdfWriter
+        except ImportError:
+            print("      ⚠️ pypdf not installed, skipping course pack (pip install pypdf)")
+            return None
+        
+        sections = [("Course Summary", generated_files.get("summary"))]
+        for idx, item in enumerate(generated_files["files"], 1):
+            sections.append((f"{idx}. {item['topic']}", item["files"].get("pdf")))
+        
+        filename = os.path.join(self.output_dir, f"{subject_name}_COURSE_PACK_{timestamp}.pdf")
+        writer = PdfWriter()
+        try:
+            for title, path in sections:
+                if not path or not os.path.isfile(path):
+                    print(f"      ⚠️ Missing PDF for {title}, left out of the course pack")
+                    continue
+                first_page = len(writer.pages)
+                writer.append(PdfReader(path), import_outline=False)
+                writer.add_outline_item(title, first_page)
+            
+            writer.page_mode = "/UseOutlines"
+            with open(filename, 'wb') as f:
+                writer.write(f)
+        except Exception as e:
+            print(f"      ⚠️ Course pack failed: {str(e)[:80]}")
+            return None
+        
+        print(f"      ✅ Course pack created: {os.path.basename(filename)} ({len(writer.pages)} pages)")
+        return filename
+    
+    def __getstate__(self):
+        # The slide pool stays in the parent; workers get everything else
+        state = self.__dict__.copy()
+        state["_render_pool"] = None
+        return state
+    
     def _sanitize_filename(self, name):
         """Clean filename for safe file system usage"""
         # Remove special characters
@@ -635,6 +1346,29 @@ class FileGenerator:
         return safe[:50]  # Limit length
 
 
+def _generate_topic_in_worker(file_generator, idx, content, safe_subject, edge_result, formats):
+    """Process-pool entry point for FileGenerator._generate_topic"""
+    # Topics already occupy every worker process; render this topic's slides inline
+    file_generator.render_processes = 1
+    return file_generator._generate_topic(idx, content, safe_subject, lambda *args: None,
+                                          edge_result, None, formats)
+
+
+def _render_slide_in_worker(file_generator, slide_data, output_path):
+    """Process-pool entry point for FileGenerator._create_slide_image"""
+    file_generator._create_slide_image(slide_data, output_path)
+
+
+def _build_pdf_in_worker(file_generator, content, base_name):
+    """Process-pool entry point for FileGenerator.generate_pdf"""
+    return file_generator.generate_pdf(content, base_name)
+
+
+def _build_summary_in_worker(file_generator, content_data, subject_name, timestamp):
+    """Process-pool entry point for FileGenerator.generate_summary"""
+    return file_generator.generate_summary(content_data, subject_name, timestamp)
+
+
 def main():
     """Test file generation"""
     from course_content_generator import CourseContentGenerator, ContentInput
@@ -4,15 +4,19 @@ Uses intelligent content generation + file creation
 """
 
 from course_content_generator import CourseContentGenerator, ContentInput
-from file_generator import FileGenerator
+from file_generator import FileGenerator, SLIDE_PNG_PROFILES, resolve_formats
+from semester_progress import SemesterProgress
 from intelligent_content_generator import IntelligentContentGenerator
 import os
 
 
-def generate_real_course_content():
+def generate_real_course_content(force=False, formats=None, slide_encoding="standard"):
     """
     Generate actual meaningful educational content
     EDIT THE INPUT DATA BELOW
+    
+    force=True rebuilds every file even if its inputs have not changed
+    formats limits the files to e.g. "ppt,pdf" (default: ppt, pdf, audio and video)
     """
     
     print("\n" + "="*80)
@@ -51,7 +55,9 @@ def generate_real_course_content():
     
     my_class_duration = 90  # minutes
     
-    my_mode = "Lecture-wise"  # Start with one lecture to see quality
+    my_mode = "Lecture-wise"  # Start with one lecture to see quality ("Semester" = next unfinished week)
+    
+    my_processes = 1  # Topics generated in parallel (0 = all CPU cores)
     
     # ============================================================
     # GENERATION STARTS HERE
@@ -70,7 +76,7 @@ def generate_real_course_content():
     
     # Step 1: Generate content structure
     print("\nStep 1: AI Agents analyzing syllabus...")
-    generator = CourseContentGenerator()
+    generator = CourseContentGenerator(semester_progress=SemesterProgress())
     result = generator.generate(input_data)
     
     print(f"\nContent structure generated:")
@@ -83,8 +89,11 @@ def generate_real_course_content():
     print(f"\nStep 2: Creating files with REAL content...")
     print("   (This includes web research for meaningful information)")
     
-    file_gen = FileGenerator()
-    files = file_gen.generate_all(result["content"], result["subject"])
+    file_gen = FileGenerator(processes=my_processes, course_pack=True, force=force,
+                             slide_encoding=slide_encoding)
+    files = file_gen.generate_all(result["content"], result["subject"], formats=formats)
+    generator.record_failed_topics(result, files["failed_topics"])
+    generator.record_semester_progress(result)
     
     # Display results
     print("\n" + "="*80)
@@ -117,6 +126,13 @@ def generate_real_course_content():
         print()
     
     print(f"  [SUMMARY] {os.path.basename(files['summary'])}")
+    if files.get('course_pack'):
+        print(f"  [COURSE PACK] {os.path.basename(files['course_pack'])}")
+    
+    if result['failed_topics']:
+        print(f"\nFailed Topics ({len(result['failed_topics'])}):")
+        for failure in result['failed_topics']:
+            print(f"   * {failure['topic']}: {failure['error']}")
     
     # Summary
     print("\n" + "="*80)
@@ -155,4 +171,15 @@ def generate_real_course_content():
 
 
 if __name__ == "__main__":
-    generate_real_course_content()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Generate lecture files for the course above")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every file, even those whose inputs have not changed")
+    parser.add_argument("--formats", default=None, type=resolve_formats,
+                        help="comma-separated files to create: ppt,pdf,audio,video (default: all)")
+    parser.add_argument("--slide-encoding", default="standard", choices=sorted(SLIDE_PNG_PROFILES),
+                        help="PNG profile for slide images; fast when they only feed the video")
+    args = parser.parse_args()
+    generate_real_course_content(force=args.force, formats=args.formats,
+                                 slide_encoding=args.slide_encoding)
@@ -4,10 +4,141 @@ Uses web search to generate real educational material
 """
 
 import requests
+from collections.abc import ItemsView, ValuesView
 from typing import Dict, List
+import threading
 import time
 
 
+class ContentFieldError(Exception):
+    """A lazily generated content field could not be generated"""
+
+
+class _Pending:
+    """Value of a generated field that has not been generated yet"""
+    
+    def __repr__(self):
+        return "<lazy>"
+    
+    def __reduce__(self):
+        return "_PENDING"  # Unpickles as the module's single instance
+
+
+_PENDING = _Pending()
+
+
+class LazyContent(dict):
+    """Topic content whose generated fields are built on first access
+    
+    A dict with the keys generate_content used to return, in the same order;
+    generated fields hold a placeholder until their value is read. Reading
+    values any way - content[key], get(), items(), dict(content),
+    json.dumps / jsonify, pickling - generates them, each at most once. If a
+    generator fails, every access raises the same ContentFieldError.
+    """
+    
+    # Generated field -> generator method called with (topic, research)
+    FIELDS = {
+        "learning_objectives": "_generate_real_objectives",
+        "ppt_slides": "_generate_real_slides",
+        "pdf_notes": "_generate_real_notes",
+        "audio_script": "_generate_real_script",
+        "video_content": "_generate_video_content",
+    }
+    
+    def __init__(self, generator, research: Dict, unit: str, topic: str, difficulty: str):
+        super().__init__(unit=unit, topic=topic, difficulty=difficulty)
+        for key in self.FIELDS:
+            dict.__setitem__(self, key, _PENDING)
+        self._generator = generator
+        self._research = research
+        self._errors = {}
+        self._lock = threading.RLock()
+    
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if value is not _PENDING:
+            return value
+        with self._lock:
+            if key in self._errors:
+                raise self._errors[key]
+            value = dict.__getitem__(self, key)
+            if value is _PENDING:
+                method = getattr(self._generator, self.FIELDS[key])
+                try:
+                    value = method(dict.__getitem__(self, "topic"), self._research)
+                except Exception as e:
+                    self._errors[key] = ContentFieldError(f"{key}: {str(e) or type(e).__name__}")
+                    raise self._errors[key] from e
+                dict.__setitem__(self, key, value)
+            return value
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            dict.__setitem__(self, key, value)
+            self._errors.pop(key, None)
+    
+    def __delitem__(self, key):
+        with self._lock:
+            dict.__delitem__(self, key)
+            self._errors.pop(key, None)
+    
+    # dict's own methods read the stored values directly; these go through
+    # __getitem__ instead. Overriding __iter__ also makes dict(content) and
+    # {**content} copy key by key rather than the placeholders
+    def __iter__(self):
+        return dict.__iter__(self)
+    
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+    
+    def items(self):
+        return ItemsView(self)
+    
+    def values(self):
+        return ValuesView(self)
+    
+    def pop(self, key, *default):
+        if key not in self:
+            return dict.pop(self, key, *default)
+        value = self[key]
+        del self[key]
+        return value
+    
+    def copy(self):
+        return self.to_dict()
+    
+    def __eq__(self, other):
+        return dict(self.items()) == other
+    
+    __hash__ = None
+    
+    def is_generated(self, key) -> bool:
+        """Whether a field already has a value (without generating it)"""
+        return dict.__getitem__(self, key) is not _PENDING
+    
+    def to_dict(self) -> Dict:
+        """Plain dict with every field generated, as generate_content used to return"""
+        return {key: self[key] for key in self}
+    
+    def __repr__(self):
+        return f"LazyContent({dict.__repr__(self)})"
+    
+    def __reduce__(self):
+        # Pickled as stored - fields not generated yet stay lazy in the copy
+        state = {"_generator": self._generator, "_research": self._research,
+                 "_errors": dict(self._errors)}
+        return _restore_lazy_content, (type(self), list(dict.items(self)), state)
+
+
+def _restore_lazy_content(cls, items, state):
+    content = dict.__new__(cls)
+    dict.update(content, items)
+    content.__dict__.update(state)
+    content._lock = threading.RLock()
+    return content
+
+
 class IntelligentContentGenerator:
     """Generates real, meaningful educational content using web research"""
     
@@ -22,19 +153,8 @@ class IntelligentContentGenerator:
         # Research the topic
         research_data = self._research_topic(topic)
         
-        # Generate comprehensive content
-        content = {
-            "unit": unit,
-            "topic": topic,
-            "difficulty": difficulty,
-            "learning_objectives": self._generate_real_objectives(topic, research_data),
-            "ppt_slides": self._generate_real_slides(topic, research_data),
-            "pdf_notes": self._generate_real_notes(topic, research_data),
-            "audio_script": self._generate_real_script(topic, research_data),
-            "video_content": self._generate_video_content(topic, research_data)
-        }
-        
-        return content
+        # Comprehensive content, each part generated when something first reads it
+        return LazyContent(self, research_data, unit, topic, difficulty)
     
     def _research_topic(self, topic: str) -> Dict:
         """Research topic using web search and knowledge"""
@@ -0,0 +1,129 @@
+"""
+Job Queue - Runs course generation in the background
+Lets /generate return a job ID right away while a fixed-size worker pool
+builds the PPT, PDF, audio and video files
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class Job:
+    """A single generation run with per-topic, per-artifact progress"""
+
+    def __init__(self, description=""):
+        self.id = uuid.uuid4().hex
+        self.description = description
+        self.status = "queued"  # queued -> running -> completed / failed
+        self.stage = "queued"
+        self.topics = []
+        self.result = None
+        self.artifacts = None  # FileGenerator.generate_all output for this run
+        self.error = None
+        self.created_at = datetime.now().isoformat(timespec="seconds")
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def set_stage(self, stage):
+        with self._lock:
+            self.stage = stage
+
+    def set_topics(self, topic_names):
+        """Register the topics this job will build files for"""
+        with self._lock:
+            self.topics = [
+                {"topic": name, "status": "pending", "artifacts": {}}
+                for name in topic_names
+            ]
+
+    def report(self, topic_index, artifact, status):
+        """Progress callback for FileGenerator.generate_all"""
+        with self._lock:
+            if not 0 <= topic_index < len(self.topics):
+                return
+            topic = self.topics[topic_index]
+            if artifact == "topic":
+                topic["status"] = status
+                return
+            topic["artifacts"][artifact] = status
+            if status == "running" and topic["status"] == "pending":
+                topic["status"] = "running"
+
+    def to_dict(self):
+        with self._lock:
+            done = sum(1 for t in self.topics if t["status"] == "done")
+            data = {
+                "job_id": self.id,
+                "description": self.description,
+                "status": self.status,
+                "stage": self.stage,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "progress": {
+                    "completed_topics": done,
+                    "total_topics": len(self.topics),
+                    "topics": [
+                        {"topic": t["topic"], "status": t["status"],
+                         "artifacts": dict(t["artifacts"])}
+                        for t in self.topics
+                    ]
+                }
+            }
+            if self.status == "completed":
+                data["result"] = self.result
+            if self.status == "failed":
+                data["error"] = self.error
+            return data
+
+
+class JobQueue:
+    """Fixed-size worker pool that runs generation jobs off the request thread"""
+
+    def __init__(self, max_workers=2, max_finished_jobs=100):
+        self.max_workers = max_workers
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="generation-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, description=""):
+        """Queue fn(job, *args) and return the Job immediately"""
+        job = Job(description)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, args):
+        job.status = "running"
+        job.started_at = datetime.now().isoformat(timespec="seconds")
+        try:
+            job.result = fn(job, *args)
+            job.status = "completed"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.stage = job.status
+            job.finished_at = datetime.now().isoformat(timespec="seconds")
+
+    def _prune(self):
+        """Forget the oldest finished jobs so the registry stays bounded"""
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job.status in ("completed", "failed")]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
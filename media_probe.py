@@ -0,0 +1,140 @@
+"""
+Media Probe - Reads MP3 duration from frame headers without decoding audio
+Uses the Xing/Info or VBRI header when the encoder wrote one, otherwise
+walks the frame headers and adds up their sample counts
+"""
+
+import mmap
+import os
+
+
+# Bitrates in kbps, indexed by [MPEG-1?][layer][bitrate index]
+_BITRATES = {
+    True: {
+        1: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+        2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+        3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    },
+    False: {
+        1: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+        2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+        3: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    },
+}
+
+# Sample rates in Hz, indexed by version bits then sample-rate index
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),   # MPEG-2.5
+}
+
+
+def _parse_frame_header(data, pos):
+    """Decode the 4-byte frame header at pos; None if it is not a valid header"""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (data[pos + 1] >> 3) & 0x03
+    layer_bits = (data[pos + 1] >> 1) & 0x03
+    bitrate_index = (data[pos + 2] >> 4) & 0x0F
+    sample_rate_index = (data[pos + 2] >> 2) & 0x03
+    padding = (data[pos + 2] >> 1) & 0x01
+    channel_mode = (data[pos + 3] >> 6) & 0x03
+
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    mpeg1 = version_bits == 3
+    layer = 4 - layer_bits
+    bitrate = _BITRATES[mpeg1][layer][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2 or mpeg1:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 576
+        length = 72 * bitrate // sample_rate + padding
+
+    return {
+        "mpeg1": mpeg1,
+        "mono": channel_mode == 3,
+        "sample_rate": sample_rate,
+        "samples": samples,
+        "length": length,
+    }
+
+
+def _skip_id3v2(data):
+    """Offset of the first byte after a leading ID3v2 tag"""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14
+            | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _find_first_frame(data, pos, limit=64 * 1024):
+    """First offset from pos where two consecutive valid frame headers line up"""
+    end = min(len(data), pos + limit)
+    while pos < end:
+        pos = data.find(b"\xFF", pos, end)
+        if pos < 0:
+            return None
+        header = _parse_frame_header(data, pos)
+        if header and (pos + header["length"] >= len(data)
+                       or _parse_frame_header(data, pos + header["length"])):
+            return pos
+        pos += 1
+    return None
+
+
+def _vbr_frame_count(data, pos, header):
+    """Frame count from a Xing/Info or VBRI header in the first frame, if any"""
+    if header["mpeg1"]:
+        side_info = 17 if header["mono"] else 32
+    else:
+        side_info = 9 if header["mono"] else 17
+
+    xing = pos + 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = int.from_bytes(data[xing + 4:xing + 8], "big")
+        if flags & 0x01:
+            return int.from_bytes(data[xing + 8:xing + 12], "big")
+
+    vbri = pos + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI":
+        return int.from_bytes(data[vbri + 14:vbri + 18], "big")
+
+    return None
+
+
+def mp3_duration(path):
+    """Duration of an MP3 file in seconds, or None if it cannot be parsed"""
+    try:
+        if os.path.getsize(path) == 0:
+            return None
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = _find_first_frame(data, _skip_id3v2(data))
+            if pos is None:
+                return None
+
+            header = _parse_frame_header(data, pos)
+            frames = _vbr_frame_count(data, pos, header)
+            if frames is not None:
+                return frames * header["samples"] / header["sample_rate"]
+
+            # No VBR header: walk the frame headers and sum their samples
+            total = 0.0
+            while header:
+                total += header["samples"] / header["sample_rate"]
+                pos += header["length"]
+                header = _parse_frame_header(data, pos)
+            return total if total > 0 else None
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,93 @@
+"""
+Packing - Fits syllabus topics into fixed-length lectures
+Fills one lecture at a time with the next untaught topics, in syllabus
+order, so a topic that does not fit only ends its lecture instead of
+stopping the schedule. Pulling later topics forward to fill the leftover
+room is opt-in (lookahead), since syllabus order is usually prerequisite
+order
+"""
+
+
+# How many topics after the first one that does not fit a lecture may pull
+# forward to fill its leftover room; 0 keeps strict syllabus order
+DEFAULT_LOOKAHEAD = 0
+
+
+def _best_fill(durations, candidates, room):
+    """Subset of candidates (positions, in order) with the largest total <= room
+
+    Subset-sum over the distinct reachable totals; among equal totals the
+    subset with the earliest topics wins.
+    """
+    best = {0: ()}
+    for position in candidates:
+        duration = durations[position]
+        for total, chosen in list(best.items()):
+            new_total = total + duration
+            if new_total > room:
+                continue
+            new_chosen = chosen + (position,)
+            if new_total not in best or new_chosen < best[new_total]:
+                best[new_total] = new_chosen
+    return best[max(best)]
+
+
+def pack_lectures(durations, capacity, max_lectures=None, budget=None, lookahead=DEFAULT_LOOKAHEAD):
+    """Packing of topic durations into lectures of capacity minutes
+
+    Returns lectures as lists of topic indices, ascending within a lecture.
+    Every lecture takes the earliest untaught topics in order while they
+    fit. With the default lookahead=0 that is strict syllabus order, and
+    no order-preserving packing uses fewer lectures. lookahead > 0 also
+    tops the lecture up with the best fit from the lookahead topics after
+    the one that did not fit, teaching them before it: [60, 50, 30] in
+    90-minute lectures gives [[0], [1, 2]] by default and [[0, 2], [1]]
+    with lookahead=1. A topic longer than a lecture gets a lecture to
+    itself. Packing stops after max_lectures lectures, or before the
+    earliest untaught topic would take the total past budget minutes;
+    topics not returned are left for later.
+    """
+    lookahead = max(0, lookahead)
+    window = []  # untaught topics looked at so far, in syllabus order
+    next_index = 0
+    lectures = []
+    used = 0
+
+    while max_lectures is None or len(lectures) < max_lectures:
+        if not window and next_index < len(durations):
+            window.append(next_index)
+            next_index += 1
+        if not window:
+            break
+
+        first = window[0]
+        if budget is not None and durations[first] > budget - used:
+            break
+        room = capacity if budget is None else min(capacity, budget - used)
+
+        # The earliest untaught topics, in order, while they fit
+        taken = 1
+        left = room - durations[first]
+        while True:
+            if taken == len(window) and next_index < len(durations):
+                window.append(next_index)
+                next_index += 1
+            if taken == len(window) or durations[window[taken]] > left:
+                break
+            left -= durations[window[taken]]
+            taken += 1
+        chosen = window[:taken]
+
+        if lookahead and taken < len(window):
+            # window[taken] is the topic that did not fit; look past it
+            while len(window) < taken + 1 + lookahead and next_index < len(durations):
+                window.append(next_index)
+                next_index += 1
+            chosen += _best_fill(durations, window[taken + 1:taken + 1 + lookahead], left)
+
+        lectures.append(chosen)
+        used += sum(durations[i] for i in chosen)
+        pulled = set(chosen[taken:])
+        window = [i for i in window[taken:] if i not in pulled]
+
+    return lectures
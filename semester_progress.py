@@ -0,0 +1,70 @@
+"""
+Semester Progress - Remembers which planned weeks already have their files
+A week is identified by a hash of its planned topics, so editing the syllabus
+or the class length only re-opens the weeks whose plan actually changed
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from artifact_cache import content_hash
+
+
+SEMESTER_PROGRESS = "semester_progress.json"
+
+# One lock per progress file, shared by every SemesterProgress in the process
+# (the web app creates one per job and runs jobs on threads)
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+
+def _lock_for(path):
+    with _file_locks_guard:
+        return _file_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def week_key(subject, week):
+    """Stable ID of one planned week: subject, week number and its exact topics"""
+    topics = [(t["unit"], t["topic"], t["difficulty"], t["estimated_minutes"]) for t in week["topics"]]
+    return content_hash("week", subject, week["week_number"], topics)
+
+
+class SemesterProgress:
+    """Materialized weeks, stored as JSON next to the generated files"""
+
+    def __init__(self, output_dir="generated_files"):
+        self.path = os.path.join(output_dir, SEMESTER_PROGRESS)
+        os.makedirs(output_dir, exist_ok=True)
+        self._lock = _lock_for(self.path)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f).get("weeks", {})
+        except (OSError, ValueError):
+            return {}
+
+    def is_materialized(self, key):
+        return key in self._load()
+
+    def record(self, subject, weeks):
+        """Mark weeks as materialized; each is a dict with "key", "week_number" and topic names"""
+        if not weeks:
+            return
+        with self._lock:
+            # Re-read so weeks recorded by other jobs since we started are kept
+            materialized = self._load()
+            for week in weeks:
+                materialized[week["key"]] = {
+                    "subject": subject,
+                    "week_number": week["week_number"],
+                    "topics": list(week["topics"]),
+                    "materialized_at": datetime.now().isoformat(timespec="seconds"),
+                }
+
+            temp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump({"weeks": materialized}, f, indent=2, sort_keys=True)
+            os.replace(temp, self.path)
@@ -0,0 +1,144 @@
+"""
+Slide Timing - Aligns the narration script to the slides
+Splits the audio script into sentences, matches them in order to the slides
+they talk about (using slide text plus the video_content segments), and
+turns the narration length into an exact per-slide cue list
+"""
+
+import re
+
+
+SENTENCE_PAUSE = 12  # characters of speaking time a sentence break is worth
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "for",
+    "from", "has", "have", "how", "i", "in", "is", "it", "its", "let", "lets",
+    "me", "my", "of", "on", "or", "so", "that", "the", "their", "these", "this",
+    "to", "us", "we", "what", "when", "where", "which", "will", "with", "you",
+    "your", "now", "here", "see", "one", "more", "some", "all", "just", "about",
+}
+
+# Nudges the alignment towards an even spread when the text gives no signal
+_POSITION_WEIGHT = 0.5
+
+
+def split_sentences(script):
+    """Sentences of the narration in spoken order"""
+    sentences = []
+    for paragraph in script.split("\n"):
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph.strip()):
+            if sentence.strip():
+                sentences.append(sentence.strip())
+    return sentences
+
+
+def _words(text):
+    return {word for word in re.findall(r"[a-z0-9]+", text.lower())
+            if len(word) > 2 and word not in _STOPWORDS}
+
+
+def _slide_vocabulary(slides, segments):
+    """Words each slide is expected to be narrated with"""
+    vocab = [_words(" ".join([slide.get("title", "")] + list(slide.get("bullets", []))))
+             for slide in slides]
+
+    # A segment belongs to the slides whose titles share a word with its title;
+    # an unmatched opening segment (the introduction) belongs to the title slide
+    for position, segment in enumerate(segments or []):
+        title_words = _words(segment.get("title", ""))
+        matches = [i for i, slide in enumerate(slides)
+                   if title_words & _words(slide.get("title", ""))]
+        if not matches and position == 0 and slides:
+            matches = [0]
+        for i in matches:
+            vocab[i] |= title_words | _words(segment.get("content", ""))
+    return vocab
+
+
+def align_sentences(sentences, slides, segments=None):
+    """Slide index for every sentence, in order, with every slide used at least once
+
+    Maximizes word overlap between sentences and slide vocabulary under the
+    constraint that the narration only ever moves forward one slide at a time.
+    Returns None when there are fewer sentences than slides.
+    """
+    n, m = len(sentences), len(slides)
+    if m == 0 or n < m:
+        return None
+
+    vocab = _slide_vocabulary(slides, segments)
+    sentence_words = [_words(sentence) for sentence in sentences]
+
+    def score(i, j):
+        overlap = len(sentence_words[i] & vocab[j])
+        expected = (i + 0.5) / n
+        return overlap - _POSITION_WEIGHT * abs(expected - (j + 0.5) / m)
+
+    # best[j] = best score with the current sentence on slide j; back[i][j] = came from j-1
+    NEG = float("-inf")
+    best = [score(0, 0)] + [NEG] * (m - 1)
+    back = [[False] * m]
+    for i in range(1, n):
+        row = [NEG] * m
+        moved = [False] * m
+        # Sentence i can be on slide j only if slides j+1.. still fit in the rest
+        for j in range(max(0, m - (n - i)), min(i, m - 1) + 1):
+            stay = best[j]
+            advance = best[j - 1] if j > 0 else NEG
+            if advance > stay:
+                row[j], moved[j] = advance + score(i, j), True
+            elif stay > NEG:
+                row[j] = stay + score(i, j)
+        best = row
+        back.append(moved)
+
+    assignment = [0] * n
+    j = m - 1
+    for i in range(n - 1, -1, -1):
+        assignment[i] = j
+        if back[i][j]:
+            j -= 1
+    return assignment
+
+
+def build_cues(script, slides, total_duration, segments=None):
+    """Exact per-slide cue list covering total_duration seconds
+
+    Each cue is {"slide", "title", "start", "end", "duration", "sentences"}.
+    Boundaries are placed on whole milliseconds from the running total, so
+    durations add up to exactly the narration length with no drift. Falls
+    back to an even split when the script cannot be aligned.
+    """
+    if not slides:
+        return []
+
+    sentences = split_sentences(script or "")
+    assignment = align_sentences(sentences, slides, segments)
+
+    weights = [0.0] * len(slides)
+    counts = [0] * len(slides)
+    if assignment is None:
+        weights = [1.0] * len(slides)
+    else:
+        for sentence, slide in zip(sentences, assignment):
+            weights[slide] += len(sentence) + SENTENCE_PAUSE
+            counts[slide] += 1
+
+    total_ms = int(round(total_duration * 1000))
+    total_weight = sum(weights)
+    cues = []
+    elapsed = 0.0
+    start_ms = 0
+    for idx, slide in enumerate(slides):
+        elapsed += weights[idx]
+        end_ms = total_ms if idx == len(slides) - 1 else int(round(total_ms * elapsed / total_weight))
+        cues.append({
+            "slide": idx,
+            "title": slide.get("title", ""),
+            "start": start_ms / 1000,
+            "end": end_ms / 1000,
+            "duration": (end_ms - start_ms) / 1000,
+            "sentences": counts[idx],
+        })
+        start_ms = end_ms
+    return cues
@@ -0,0 +1,272 @@
+"""
+Speech Synthesis - Concurrent neural TTS for a whole course
+Synthesizes every topic's audio script on one asyncio event loop with a
+bounded number of edge-tts calls in flight and a timeout per call, keeps
+finished audio in a size-bounded on-disk cache, and remembers which TTS
+backends are down so the fallback chain skips them
+"""
+
+import asyncio
+import io
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+from artifact_cache import content_hash, link_or_copy
+
+
+class AudioCache:
+    """On-disk TTS audio keyed by script, voice, rate and engine, LRU-evicted by size"""
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, script, voice, rate, engine):
+        return content_hash("tts", script, voice, str(rate), engine)
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def contains(self, key):
+        return os.path.isfile(self.path_for(key))
+
+    def get(self, key, target):
+        """Place cached audio at target and mark it recently used"""
+        cached = self.path_for(key)
+        try:
+            link_or_copy(cached, target)
+        except FileNotFoundError:
+            return False
+        # mtime doubles as the LRU timestamp (atime is often disabled)
+        now = time.time()
+        os.utime(cached, (now, now))
+        return True
+
+    def put(self, key, source):
+        """Add freshly synthesized audio, then evict down to max_bytes"""
+        if not os.path.isfile(source) or os.path.getsize(source) == 0:
+            return
+        cached = self.path_for(key)
+        temp = f"{cached}.{uuid.uuid4().hex}.tmp"
+        shutil.copy2(source, temp)
+        os.replace(temp, cached)
+        now = time.time()
+        os.utime(cached, (now, now))
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".mp3"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a TTS backend that is known to be failing"""
+
+
+class CircuitBreaker:
+    """Process-wide health of one TTS backend
+    
+    closed    - calls go through
+    open      - calls are skipped until the cooldown has passed, then a
+                background probe (or a single trial call) checks the backend
+    half_open - the trial call is in flight; everything else is skipped
+    """
+
+    def __init__(self, name, failure_threshold=2, cooldown=120, probe=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probe = probe
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call to this backend should be attempted now"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            if self.probe is None:
+                self.state = "half_open"
+                return True
+            if not self._probing:
+                self._probing = True
+                threading.Thread(target=self._run_probe, name=f"{self.name}-probe",
+                                 daemon=True).start()
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.last_error = None
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)[:200] if error else None
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"      ⚠️ {self.name} marked unavailable for {self.cooldown}s")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def _run_probe(self):
+        try:
+            self.probe()
+        except Exception as e:
+            with self._lock:
+                self.opened_at = time.monotonic()
+                self.last_error = str(e)[:200]
+        else:
+            self.record_success()
+            print(f"      {self.name} is reachable again")
+        finally:
+            with self._lock:
+                self._probing = False
+
+    def to_dict(self):
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "last_error": self.last_error}
+
+
+PROBE_TIMEOUT = 15  # seconds
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(engine, voice="en-US-GuyNeural"):
+    """The shared CircuitBreaker for a TTS engine (edge-tts, pyttsx3 or gtts)"""
+    with _breakers_lock:
+        if engine not in _breakers:
+            probes = {
+                "edge-tts": lambda: _probe_edge_tts(voice),
+                "pyttsx3": _probe_pyttsx3,
+                "gtts": _probe_gtts,
+            }
+            _breakers[engine] = CircuitBreaker(engine, probe=probes.get(engine))
+        return _breakers[engine]
+
+
+def breaker_status():
+    with _breakers_lock:
+        return {engine: breaker.to_dict() for engine, breaker in _breakers.items()}
+
+
+def _probe_edge_tts(voice):
+    import edge_tts
+    
+    async def probe():
+        async for chunk in edge_tts.Communicate("Hello.", voice).stream():
+            if chunk["type"] == "audio":
+                return
+    
+    asyncio.run(asyncio.wait_for(probe(), timeout=PROBE_TIMEOUT))
+
+
+def _probe_pyttsx3():
+    import pyttsx3
+    pyttsx3.init()
+
+
+def _probe_gtts():
+    from gtts import gTTS
+    gTTS(text="Hello.", lang='en', timeout=PROBE_TIMEOUT).write_to_fp(io.BytesIO())
+
+
+class SpeechSynthesizer:
+    """Runs edge-tts for many scripts at once in a background event loop"""
+
+    def __init__(self, voice="en-US-GuyNeural", rate="-5%", concurrency=4, timeout=120):
+        self.voice = voice
+        self.rate = rate
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    def start_batch(self, jobs):
+        """Start synthesizing {key: (script, filename)} in the background
+
+        Returns {key: Future}. Each future resolves to the path of a finished
+        temporary MP3 (rename it into place) or to the Exception that stopped
+        edge-tts for that key, so callers can fall back per topic.
+        """
+        futures = {key: Future() for key in jobs}
+        if not jobs:
+            return futures
+
+        thread = threading.Thread(target=self._run_batch, args=(jobs, futures),
+                                  name="edge-tts-batch", daemon=True)
+        thread.start()
+        return futures
+
+    def _run_batch(self, jobs, futures):
+        try:
+            asyncio.run(self._synthesize_all(jobs, futures))
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_result(e)
+
+    async def _synthesize_all(self, jobs, futures):
+        breaker = get_breaker("edge-tts", self.voice)
+        try:
+            import edge_tts
+        except ImportError as e:
+            breaker.record_failure(e)
+            for future in futures.values():
+                future.set_result(e)
+            return
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def synthesize(key, script, filename):
+            temp_file = f"{filename}.part"
+            async with semaphore:
+                # Checked after queueing so calls stop as soon as the backend is known down
+                if not breaker.allow():
+                    futures[key].set_result(CircuitOpenError("edge-tts is marked unavailable"))
+                    return
+                try:
+                    communicate = edge_tts.Communicate(script, self.voice, rate=self.rate, pitch="+0Hz")
+                    await asyncio.wait_for(communicate.save(temp_file), timeout=self.timeout)
+                    breaker.record_success()
+                    futures[key].set_result(temp_file)
+                except Exception as e:
+                    if os.path.exists(temp_file):
+                        os.remove(temp_file)
+                    if isinstance(e, asyncio.TimeoutError):
+                        e = TimeoutError(f"edge-tts timed out after {self.timeout}s")
+                    breaker.record_failure(e)
+                    futures[key].set_result(e)
+
+        await asyncio.gather(*(synthesize(key, script, filename)
+                               for key, (script, filename) in jobs.items()))
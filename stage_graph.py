@@ -0,0 +1,84 @@
+"""
+Stage Graph - Runs a small dependency graph of build stages
+Each stage starts as soon as the stages it depends on have finished, and
+per-stage wall-clock times are recorded so the critical path is visible
+"""
+
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class StageGraph:
+    """Dependency-aware runner for the stages of one build"""
+
+    def __init__(self):
+        self._stages = OrderedDict()
+
+    def add(self, name, fn, deps=()):
+        """Register fn(results) to run once every stage in deps has finished"""
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self._stages[name] = {"fn": fn, "deps": tuple(deps)}
+
+    def run(self, max_workers=None):
+        """Run all stages; returns (results, timings)
+
+        results maps stage name -> return value. timings maps stage name ->
+        {"start", "end", "seconds"} relative to the start of the run. The
+        first stage exception is re-raised once running stages have drained.
+        """
+        results = {}
+        timings = {}
+        pending = OrderedDict(self._stages)
+        running = {}
+        error = None
+        origin = time.perf_counter()
+
+        def timed(name, fn):
+            start = time.perf_counter() - origin
+            try:
+                return fn(results)
+            finally:
+                end = time.perf_counter() - origin
+                timings[name] = {"start": round(start, 3), "end": round(end, 3),
+                                 "seconds": round(end - start, 3)}
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(self._stages) or 1) as pool:
+            while pending or running:
+                if error is None:
+                    ready = [name for name, stage in pending.items()
+                             if all(dep in results for dep in stage["deps"])]
+                    for name in ready:
+                        stage = pending.pop(name)
+                        running[pool.submit(timed, name, stage["fn"])] = name
+                elif not running:
+                    break
+
+                if not running:
+                    raise RuntimeError(f"Unresolvable stage dependencies: {list(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        if error is None:
+                            error = e
+
+        if error is not None:
+            raise error
+        return results, timings
+
+    def critical_path(self, timings):
+        """Chain of stages that determined the total wall-clock time"""
+        if not timings:
+            return []
+        name = max(timings, key=lambda stage: timings[stage]["end"])
+        path = [name]
+        while self._stages[name]["deps"]:
+            name = max(self._stages[name]["deps"], key=lambda dep: timings[dep]["end"])
+            path.append(name)
+        return list(reversed(path))
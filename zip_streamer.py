@@ -0,0 +1,141 @@
+"""
+ZIP Streamer - Builds a ZIP archive on the fly for one generation run
+Yields the archive chunk by chunk so nothing is written to disk and memory
+stays flat however large the course is
+"""
+
+import io
+import json
+import os
+import zipfile
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Already-compressed media is stored as-is; recompressing it only burns CPU
+STORED_EXTENSIONS = {'.mp3', '.mp4', '.png', '.jpg', '.jpeg', '.pptx', '.zip'}
+
+# A directory holding this file lists members that live elsewhere on disk
+PACKAGE_MANIFEST = "package.json"
+
+
+def write_package_manifest(package_dir, members):
+    """Record {name inside the package: path on disk} instead of copying files in"""
+    manifest = {name: os.path.relpath(path, package_dir) for name, path in members.items()}
+    with open(os.path.join(package_dir, PACKAGE_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump({"files": manifest}, f, indent=2)
+
+
+def read_package_manifest(package_dir):
+    """{name inside the package: absolute source path} for a manifest package"""
+    with open(os.path.join(package_dir, PACKAGE_MANIFEST), encoding='utf-8') as f:
+        manifest = json.load(f)
+    return {name: os.path.normpath(os.path.join(package_dir, source))
+            for name, source in manifest["files"].items()}
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink that hands written bytes back in chunks"""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def run_entries(generated_files, output_dir):
+    """List (path, arcname) pairs for the artifacts of one generate_all run
+
+    Only paths the run reported are listed - each topic's files and slide
+    images plus the summary - so files left in a lecture folder by earlier
+    runs are not shipped. Manifest packages are expanded here: their members
+    are read from where they live on disk and placed inside the package in
+    the archive.
+    """
+    entries = []
+    seen = set()
+
+    def arcname_for(path):
+        arcname = os.path.relpath(path, output_dir)
+        if arcname.startswith(os.pardir):
+            arcname = os.path.basename(path)
+        return arcname
+
+    def add(path, arcname=None):
+        arcname = arcname or arcname_for(path)
+        if arcname in seen or not os.path.isfile(path) or os.path.getsize(path) == 0:
+            return
+        seen.add(arcname)
+        entries.append((path, arcname))
+
+    def add_package(path):
+        package_arcname = arcname_for(path)
+        if os.path.isfile(os.path.join(path, PACKAGE_MANIFEST)):
+            for name, source in sorted(read_package_manifest(path).items()):
+                add(source, os.path.join(package_arcname, name))
+        # Files written into the package itself, such as its instructions
+        for name in sorted(os.listdir(path)):
+            if name != PACKAGE_MANIFEST:
+                add(os.path.join(path, name))
+
+    for item in generated_files["files"]:
+        for path in item["files"].values():
+            if os.path.isdir(path):
+                add_package(path)
+            else:
+                add(path)
+        for path in item.get("slides", []):
+            add(path)
+
+    for key in ("summary", "course_pack"):
+        if generated_files.get(key):
+            add(generated_files[key])
+
+    return entries
+
+
+def stream_zip(entries, chunk_size=CHUNK_SIZE):
+    """Yield a ZIP archive of (path, arcname) entries as it is being built"""
+    buffer = _ChunkBuffer()
+
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for path, arcname in entries:
+            zinfo = zipfile.ZipInfo.from_file(path, arcname)
+            if os.path.splitext(path)[1].lower() in STORED_EXTENSIONS:
+                zinfo.compress_type = zipfile.ZIP_STORED
+            else:
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+
+            with open(path, 'rb') as src, zipf.open(zinfo, 'w') as dest:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+
+            data = buffer.drain()
+            if data:
+                yield data
+
+    # Central directory is written when the archive is closed
+    data = buffer.drain()
+    if data:
+        yield data